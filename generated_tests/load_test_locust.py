@@ -1,25 +1,45 @@
 
-from locust import HttpUser, task, between
-import random
+from locust import task, between
+from locust.contrib.fasthttp import FastHttpUser
+import atexit
+import gevent
 import json
-import time
 import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+class _RootForwarder(logging.Handler):
+    def emit(self, record):
+        logging.getLogger().handle(record)
+
+# Users log through a queue drained by one listener so greenlets never wait on handler I/O
+_log_queue = queue.SimpleQueue()
+_log_listener = QueueListener(_log_queue, _RootForwarder())
+_log_listener.start()
+atexit.register(_log_listener.stop)
 
 logger = logging.getLogger(__name__)
+logger.propagate = False
+logger.addHandler(QueueHandler(_log_queue))
 
-class WebsiteUser(HttpUser):
+class WebsiteUser(FastHttpUser):
+    # Random think time between tasks; each flow's own "wait" steps run inside its task
     wait_time = between(1, 5)
+    connection_timeout = 10.0
+    network_timeout = 30.0
+    default_headers = {
+        'User-Agent': 'LoadTest-Agent/1.0'
+    }
     
     def on_start(self):
         """Called when a user starts"""
-        self.client.headers.update({
-            'User-Agent': 'LoadTest-Agent/1.0'
-        })
-        logger.info(f"User started")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("User started")
     
     def on_stop(self):
         """Called when a user stops"""
-        logger.info(f"User stopped")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("User stopped")
 
 
     @task(3)
@@ -29,7 +49,7 @@ class WebsiteUser(HttpUser):
             
             # Visit homepage
             
-            with self.client.get("/", catch_response=True) as response:
+            with self.client.get("/", name="/", catch_response=True) as response:
                 if response.status_code == 200:
                     response.success()
                 else:
@@ -41,14 +61,11 @@ class WebsiteUser(HttpUser):
             
             # Think time
             
-            time.sleep(2)
-            
-            
+            # Yields to other users instead of blocking the worker
+            gevent.sleep(2)
             
             
             
-            # Random think time
-            time.sleep(random.uniform(0.5, 2.0))
             
         except Exception as e:
             logger.error(f"Error in basic_navigation: {str(e)}")
@@ -11,30 +11,70 @@ from typing import Optional, List
 from pathlib import Path
 from rich.console import Console
 from rich.table import Table
-from rich.progress import Progress, SpinnerColumn, TextColumn
-import json
 
 import sys
-sys.path.append("D:\\PProjects\\ML\\ai-testing-agent\\src")
 
-from src.agents.test_agent import TestAgent
-from src.agents.ui_analyzer import UIAnalyzer
-from src.utils.config import config
-from src.generators.test_generator import TestGenerator
-from src.generators.api_test_generator import APITestGenerator
-from src.generators.load_test_generator import LoadTestGenerator
-from src.automation.visual_testing import VisualTester
+from src.utils import json_utils
+
+DEFAULT_LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 
-# Setup logging
-logging.basicConfig(
-    level=getattr(logging, config.data.get('logging', {}).get('level', 'INFO')),
-    format=config.data.get('logging', {}).get('format', '%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-)
 logger = logging.getLogger(__name__)
+_configured = False
 
 app = typer.Typer(help="AI Agent for Automated Testing")
 console = Console()
 
+def _setup_logging():
+    """Configure logging from settings once per process, on the first command"""
+    global _configured
+    if _configured:
+        return
+    from src.utils.config import config
+    log_cfg = config.data.get('logging', {})
+    logging.basicConfig(
+        level=getattr(logging, log_cfg.get('level', 'INFO')),
+        format=log_cfg.get('format', DEFAULT_LOG_FORMAT)
+    )
+    _configured = True
+
+def _bootstrap_paths():
+    """Make the src packages importable; commands import their heavy modules lazily"""
+    src_dir = str(Path(__file__).resolve().parent / "src")
+    if src_dir not in sys.path:
+        sys.path.append(src_dir)
+
+_REPORT_HTML = """
+<!DOCTYPE html>
+<html>
+<head>
+    <title>Test Execution Report</title>
+    <style>
+        body {{ font-family: Arial, sans-serif; margin: 20px; }}
+        .summary {{ background: #f5f5f5; padding: 15px; border-radius: 5px; }}
+        .passed {{ color: #4CAF50; }}
+        .failed {{ color: #f44336; }}
+        .test-section {{ margin: 20px 0; }}
+    </style>
+</head>
+<body>
+    <h1>Test Execution Report</h1>
+    
+    <div class="summary">
+        <h2>Summary</h2>
+        <p>Total Tests: {total}</p>
+        <p>Passed: <span class="passed">{passed}</span></p>
+        <p>Failed: <span class="failed">{failed}</span></p>
+        <p>Success Rate: {success_rate:.1f}%</p>
+    </div>
+    
+    <div class="test-section">
+        <h2>Test Results</h2>
+        <!-- Add detailed test results here -->
+    </div>
+</body>
+</html>
+"""
+
 @app.command()
 def analyze(
     url: str = typer.Argument(..., help="URL to analyze"),
@@ -42,6 +82,11 @@ def analyze(
     verbose: bool = typer.Option(False, "--verbose", "-v", help="Verbose output")
 ):
     """Analyze a web application and extract testing information"""
+    _setup_logging()
+    _bootstrap_paths()
+    from src.utils.config import config
+    from rich.progress import Progress, SpinnerColumn, TextColumn
+    from src.agents.test_agent import TestAgent
     
     async def run_analysis():
         console.print(f"🔍 Analyzing application: {url}", style="bold blue")
@@ -75,8 +120,7 @@ def analyze(
                 else:
                     output_path = config.reports_dir / "analysis_results.json"
                 
-                with open(output_path, 'w') as f:
-                    json.dump(analysis, f, indent=2)
+                output_path.write_bytes(json_utils.dumps(analysis))
                 
                 console.print(f"📄 Analysis saved to: {output_path}", style="green")
                 
@@ -95,6 +139,11 @@ def generate_tests(
     output_dir: Optional[str] = typer.Option(None, "--output", "-o", help="Output directory for test files")
 ):
     """Generate test suite based on analysis"""
+    _setup_logging()
+    _bootstrap_paths()
+    from src.utils.config import config
+    from rich.progress import Progress, SpinnerColumn, TextColumn
+    from src.agents.test_agent import TestAgent
     
     async def run_generation():
         agent = TestAgent()
@@ -102,8 +151,7 @@ def generate_tests(
         # Get analysis
         if analysis_file:
             console.print(f"📖 Loading analysis from: {analysis_file}")
-            with open(analysis_file, 'r') as f:
-                analysis = json.load(f)
+            analysis = json_utils.loads(Path(analysis_file).read_bytes())
         elif url:
             console.print(f"🔍 Analyzing {url} for test generation...")
             analysis = await agent.analyze_application(url)
@@ -152,6 +200,11 @@ def run_tests(
     generate_report: bool = typer.Option(True, "--report", "-r", help="Generate HTML report")
 ):
     """Execute generated test suite"""
+    _setup_logging()
+    _bootstrap_paths()
+    from src.utils.config import config
+    from rich.progress import Progress, SpinnerColumn, TextColumn
+    from src.agents.test_agent import TestAgent
     
     async def run_execution():
         agent = TestAgent()
@@ -159,15 +212,13 @@ def run_tests(
         # Load test suite
         if test_suite_file:
             console.print(f"📖 Loading test suite from: {test_suite_file}")
-            with open(test_suite_file, 'r') as f:
-                test_suite = json.load(f)
+            test_suite = json_utils.loads(Path(test_suite_file).read_bytes())
         else:
             # Try to load default test suite
             default_suite = config.tests_dir / "generated_test_suite.json"
             if default_suite.exists():
                 console.print(f"📖 Loading default test suite: {default_suite}")
-                with open(default_suite, 'r') as f:
-                    test_suite = json.load(f)
+                test_suite = json_utils.loads(default_suite.read_bytes())
             else:
                 console.print("❌ No test suite found. Generate tests first.", style="bold red")
                 return
@@ -198,22 +249,27 @@ def run_tests(
                 progress.update(task, description="Test execution failed!")
                 console.print(f"❌ Error during test execution: {e}", style="bold red")
                 logger.error(f"Test execution error: {e}")
+            finally:
+                await agent.aclose()
     
     asyncio.run(run_execution())
 
 @app.command()
 def visual_test(
-    url: str = typer.Argument(..., help="URL to test"),
+    urls: List[str] = typer.Argument(..., help="URLs to test"),
     create_baseline: bool = typer.Option(False, "--baseline", "-b", help="Create baseline screenshots"),
-    cross_browser: bool = typer.Option(False, "--cross-browser", "-c", help="Run cross-browser tests")
+    cross_browser: bool = typer.Option(False, "--cross-browser", "-c", help="Run cross-browser tests"),
+    concurrency: int = typer.Option(4, "--concurrency", "-n", help="Maximum number of URLs tested concurrently")
 ):
     """Run visual regression tests"""
+    _setup_logging()
+    _bootstrap_paths()
+    from rich.progress import Progress, SpinnerColumn, TextColumn
+    from src.automation.visual_testing import VisualTester
     
-    async def run_visual_tests():
-        visual_tester = VisualTester()
-        
+    async def run_visual_tests(visual_tester: VisualTester):
         if create_baseline:
-            console.print(f"📸 Creating baseline screenshots for: {url}")
+            console.print(f"📸 Creating baseline screenshots for: {', '.join(urls)}")
             
             with Progress(
                 SpinnerColumn(),
@@ -223,7 +279,7 @@ def visual_test(
                 task = progress.add_task("Creating baselines...", total=None)
                 
                 try:
-                    baseline_results = await visual_tester.create_baseline_suite([url])
+                    baseline_results = await visual_tester.create_baseline_suite(urls)
                     progress.update(task, description="Baseline creation complete!")
                     
                     console.print(f"✅ Created {len(baseline_results['created'])} baseline screenshots", style="bold green")
@@ -236,13 +292,23 @@ def visual_test(
                     console.print(f"❌ Error creating baselines: {e}", style="bold red")
         
         else:
-            console.print(f"🔍 Running visual regression tests for: {url}")
+            console.print(f"🔍 Running visual regression tests for: {', '.join(urls)}")
             
-            test_config = {
-                "name": "Visual Regression Test",
-                "url": url,
-                "type": "full_page"
-            }
+            test_configs = [
+                {
+                    "name": "Visual Regression Test" if len(urls) == 1 else f"Visual Regression Test {i + 1}",
+                    "url": url,
+                    "type": "full_page"
+                }
+                for i, url in enumerate(urls)
+            ]
+            
+            # Cross-browser runs launch their own browsers per URL; plain runs share one
+            sem = asyncio.Semaphore(concurrency)
+            
+            async def _one(test_config: dict):
+                async with sem:
+                    return await VisualTester().run_cross_browser_visual_test(test_config)
             
             with Progress(
                 SpinnerColumn(),
@@ -253,16 +319,17 @@ def visual_test(
                 
                 try:
                     if cross_browser:
-                        results = await visual_tester.run_cross_browser_visual_test(test_config)
+                        all_results = await asyncio.gather(*[_one(tc) for tc in test_configs])
                         progress.update(task, description="Cross-browser testing complete!")
-                        _display_cross_browser_results(results)
+                        for test_config, results in zip(test_configs, all_results):
+                            console.print(f"\n🌐 {test_config['url']}")
+                            _display_cross_browser_results(results)
                     else:
-                        results = await visual_tester.run_visual_tests([test_config])
+                        results = await visual_tester.run_visual_tests(test_configs, concurrency=concurrency)
                         progress.update(task, description="Visual testing complete!")
                         _display_visual_test_results(results)
-                    
-                    # Generate report
-                    if not cross_browser:
+                        
+                        # Generate report
                         report_path = visual_tester.generate_visual_test_report(results)
                         console.print(f"📊 Visual test report: {report_path}", style="green")
                 
@@ -270,7 +337,49 @@ def visual_test(
                     progress.update(task, description="Visual testing failed!")
                     console.print(f"❌ Error during visual testing: {e}", style="bold red")
     
-    asyncio.run(run_visual_tests())
+    async def run_with_tester():
+        # One tester keeps its browser up for every URL; release it however the run ends
+        visual_tester = VisualTester()
+        try:
+            await run_visual_tests(visual_tester)
+        finally:
+            await visual_tester.aclose()
+    
+    asyncio.run(run_with_tester())
+
+@app.command()
+def screenshot(
+    urls: List[str] = typer.Argument(..., help="URLs to capture"),
+    full_page: bool = typer.Option(False, "--full-page", "-f", help="Capture the full scrollable page")
+):
+    """Capture screenshots of several URLs with one browser (one page per origin when batching)"""
+    _setup_logging()
+    _bootstrap_paths()
+    from src.utils.config import config
+    from src.automation.playwright_runner import PlaywrightRunner
+    
+    async def run_screenshots():
+        output_dir = config.screenshots_dir / "batch"
+        output_dir.mkdir(parents=True, exist_ok=True)
+        specs = [
+            {"url": url, "path": output_dir / f"screenshot_{i + 1}.png", "full_page": full_page}
+            for i, url in enumerate(urls)
+        ]
+        
+        async with PlaywrightRunner() as runner:
+            results = await runner.batch_screenshot(specs)
+        
+        table = Table(title="Screenshots")
+        table.add_column("URL", style="cyan")
+        table.add_column("Result", style="green")
+        for result in results:
+            if result.get("status") == "completed":
+                table.add_row(result["url"], result["screenshot"])
+            else:
+                table.add_row(str(result.get("url")), f"[red]{result.get('error', 'failed')}[/red]")
+        console.print(table)
+    
+    asyncio.run(run_screenshots())
 
 @app.command()
 def continuous(
@@ -279,19 +388,26 @@ def continuous(
     max_runs: Optional[int] = typer.Option(None, "--max-runs", "-m", help="Maximum number of runs")
 ):
     """Run continuous testing"""
+    _setup_logging()
+    _bootstrap_paths()
+    import aiohttp
+    from src.agents.test_agent import TestAgent
     
     async def run_continuous():
         console.print(f"🔄 Starting continuous testing for: {url}")
         console.print(f"⏰ Check interval: {interval} seconds")
         
-        agent = TestAgent()
-        
-        try:
-            await agent.continuous_testing(url, interval)
-        except KeyboardInterrupt:
-            console.print("\n⏹️  Continuous testing stopped by user", style="yellow")
-        except Exception as e:
-            console.print(f"❌ Continuous testing error: {e}", style="bold red")
+        # One pooled keep-alive session for every iteration; closed on exit or Ctrl+C
+        connector = aiohttp.TCPConnector(limit=100, ttl_dns_cache=300, keepalive_timeout=60)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            agent = TestAgent(http_session=session)
+            
+            try:
+                await agent.continuous_testing(url, interval)
+            except KeyboardInterrupt:
+                console.print("\n⏹️  Continuous testing stopped by user", style="yellow")
+            except Exception as e:
+                console.print(f"❌ Continuous testing error: {e}", style="bold red")
     
     asyncio.run(run_continuous())
 
@@ -303,6 +419,15 @@ def load_test(
     spawn_rate: int = typer.Option(2, "--spawn-rate", "-r", help="User spawn rate per second")
 ):
     """Run load tests"""
+    _setup_logging()
+    _bootstrap_paths()
+    from rich.progress import Progress, SpinnerColumn, TextColumn
+    from src.generators.load_test_generator import LoadTestGenerator
+    try:
+        # Locust gevent-patches the stdlib on import; that must happen before the progress thread starts
+        import locust  # noqa: F401
+    except ImportError:
+        pass
     
     console.print(f"⚡ Running load test for: {url}")
     console.print(f"👥 Users: {users}, Duration: {duration}, Spawn rate: {spawn_rate}/s")
@@ -336,7 +461,7 @@ def load_test(
             
             progress.update(task, description="Running load test...")
             
-            # Use synchronous version for better compatibility
+            # Run Locust in-process so stats come back without parsing stdout
             results = load_generator.run_locust_test_sync(
                 test_file, url, users, spawn_rate, duration
             )
@@ -350,14 +475,12 @@ def load_test(
                     console.print(f"📊 HTML report: {html_report}")
                     console.print(f"📈 Open in browser: file://{Path(html_report).absolute()}")
                 
-                # Show some basic stats from stdout
-                stdout = results.get('stdout', '')
-                if stdout:
-                    lines = stdout.split('\n')
-                    for line in lines:
-                        if any(keyword in line.lower() for keyword in ['requests', 'rps', 'response time', 'failures']):
-                            if line.strip():
-                                console.print(f"📈 {line.strip()}")
+                # Show some basic stats straight from the runner
+                stats = results.get('stats')
+                if stats:
+                    console.print(f"📈 Requests: {stats['requests']}, Failures: {stats['failures']} ({stats['fail_ratio'] * 100:.1f}%)")
+                    console.print(f"📈 RPS: {stats['rps']:.2f}")
+                    console.print(f"📈 Response time (ms): avg {stats['avg_response_time']:.0f}, median {stats['median_response_time']:.0f}, p95 {stats['p95_response_time']:.0f}, max {stats['max_response_time']:.0f}")
                             
             else:
                 error_msg = results.get('error', 'Unknown error')
@@ -376,6 +499,8 @@ def load_test(
 @app.command()
 def config_info():
     """Display current configuration"""
+    _setup_logging()
+    from src.utils.config import config
     
     table = Table(title="AI Testing Agent Configuration")
     table.add_column("Setting", style="cyan")
@@ -392,6 +517,10 @@ def config_info():
     
     console.print(table)
 
+# Pre-rendered status cells for the result tables
+_VISUAL_STATUS_MARKUP = {"passed": "[green]passed[/green]"}
+_BROWSER_STATUS_MARKUP = {"success": "[green]success[/green]"}
+
 def _display_analysis_results(analysis: dict):
     """Display analysis results in a formatted way"""
     
@@ -429,10 +558,11 @@ def _display_test_results(results: dict):
     table.add_column("Metric", style="cyan")
     table.add_column("Value", style="green")
     
-    table.add_row("Total Tests", str(summary.get("total", 0)))
-    table.add_row("Passed", str(summary.get("passed", 0)))
-    table.add_row("Failed", str(summary.get("failed", 0)))
-    table.add_row("Success Rate", f"{summary.get('success_rate', 0):.1f}%")
+    add_row = table.add_row
+    add_row("Total Tests", str(summary.get("total", 0)))
+    add_row("Passed", str(summary.get("passed", 0)))
+    add_row("Failed", str(summary.get("failed", 0)))
+    add_row("Success Rate", f"{summary.get('success_rate', 0):.1f}%")
     
     console.print(table)
 
@@ -444,15 +574,14 @@ def _display_visual_test_results(results: list):
     table.add_column("Status", style="green")
     table.add_column("Similarity", style="yellow")
     
+    add_row = table.add_row
     for result in results:
-        status_style = "green" if result.get("status") == "passed" else "red"
-        similarity = result.get("similarity", 0)
-        similarity_str = f"{similarity * 100:.1f}%" if similarity else "N/A"
-        
-        table.add_row(
+        status = result.get("status", "unknown")
+        similarity = result.get("similarity") or 0
+        add_row(
             result.get("name", "Unknown"),
-            f"[{status_style}]{result.get('status', 'unknown')}[/{status_style}]",
-            similarity_str
+            _VISUAL_STATUS_MARKUP.get(status) or f"[red]{status}[/red]",
+            f"{similarity * 100:.1f}%" if similarity else "N/A"
         )
     
     console.print(table)
@@ -464,16 +593,15 @@ def _display_cross_browser_results(results: dict):
     table.add_column("Browser", style="cyan")
     table.add_column("Status", style="green")
     
+    add_row = table.add_row
     for browser, result in results.items():
         if browser == 'cross_browser_comparison':
             continue
         
         status = result.get("status", "unknown")
-        status_style = "green" if status == "success" else "red"
-        
-        table.add_row(
+        add_row(
             browser.title(),
-            f"[{status_style}]{status}[/{status_style}]"
+            _BROWSER_STATUS_MARKUP.get(status) or f"[red]{status}[/red]"
         )
     
     console.print(table)
@@ -488,71 +616,47 @@ def _display_cross_browser_results(results: dict):
 
 async def _save_test_files(test_suite: dict, output_dir: Path):
     """Save generated test files"""
+    from src.generators.test_generator import TestGenerator
+    
     output_dir.mkdir(parents=True, exist_ok=True)
     
     test_generator = TestGenerator()
+    loop = asyncio.get_running_loop()
+    
+    def _write(path: Path, content: str):
+        with open(path, 'w') as f:
+            f.write(content)
+    
+    async def _generate_and_write(path: Path, generate, *args):
+        content = await loop.run_in_executor(None, generate, *args)
+        await loop.run_in_executor(None, _write, path, content)
+    
+    tasks = [
+        _generate_and_write(output_dir / "conftest.py", test_generator.generate_conftest),
+        _generate_and_write(output_dir / "pytest.ini", test_generator.generate_pytest_config)
+    ]
     
     # Save functional tests
     if test_suite.get("functional_tests"):
-        functional_code = test_generator.generate_functional_tests(test_suite["functional_tests"])
-        with open(output_dir / "test_functional.py", 'w') as f:
-            f.write(functional_code)
-    
-    # Save conftest
-    conftest_code = test_generator.generate_conftest()
-    with open(output_dir / "conftest.py", 'w') as f:
-        f.write(conftest_code)
-    
-    # Save pytest config
-    pytest_config = test_generator.generate_pytest_config()
-    with open(output_dir / "pytest.ini", 'w') as f:
-        f.write(pytest_config)
+        tasks.append(_generate_and_write(
+            output_dir / "test_functional.py",
+            test_generator.generate_functional_tests,
+            test_suite["functional_tests"]
+        ))
+    
+    await asyncio.gather(*tasks)
 
 async def _generate_html_report(results: dict) -> str:
     """Generate HTML test report"""
-    html_template = """
-<!DOCTYPE html>
-<html>
-<head>
-    <title>Test Execution Report</title>
-    <style>
-        body { font-family: Arial, sans-serif; margin: 20px; }
-        .summary { background: #f5f5f5; padding: 15px; border-radius: 5px; }
-        .passed { color: #4CAF50; }
-        .failed { color: #f44336; }
-        .test-section { margin: 20px 0; }
-    </style>
-</head>
-<body>
-    <h1>Test Execution Report</h1>
-    
-    <div class="summary">
-        <h2>Summary</h2>
-        <p>Total Tests: {{ summary.total }}</p>
-        <p>Passed: <span class="passed">{{ summary.passed }}</span></p>
-        <p>Failed: <span class="failed">{{ summary.failed }}</span></p>
-        <p>Success Rate: {{ "%.1f"|format(summary.success_rate) }}%</p>
-    </div>
-    
-    <div class="test-section">
-        <h2>Test Results</h2>
-        <!-- Add detailed test results here -->
-    </div>
-</body>
-</html>
-"""
-    
-    from jinja2 import Template
-    template = Template(html_template)
-    
-    html_content = template.render(
-        summary=results.get("summary", {}),
-        results=results
-    )
-    
+    from src.utils.config import config
     report_path = config.reports_dir / "test_execution_report.html"
-    with open(report_path, 'w') as f:
-        f.write(html_content)
+    summary = results.get("summary", {})
+    report_path.write_text(_REPORT_HTML.format_map({
+        'total': summary.get('total', 0),
+        'passed': summary.get('passed', 0),
+        'failed': summary.get('failed', 0),
+        'success_rate': summary.get('success_rate', 0.0)
+    }))
     
     return str(report_path)
 
@@ -31,6 +31,15 @@ setup(
         "typer>=0.9.0",
         "pydantic>=2.5.0",
     ],
+    extras_require={
+        # Optional accelerators; every code path falls back when these are missing
+        "perf": [
+            "numba>=0.58.0",
+            "orjson>=3.9.0",
+            "msgspec>=0.18.0",
+            "uvloop>=0.17.0; sys_platform != 'win32'",
+        ],
+    },
     entry_points={
         "console_scripts": [
             "ai-test-agent=main:app",
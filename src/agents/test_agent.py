@@ -1,56 +1,173 @@
 import asyncio
-import json
-from typing import Dict, List, Any, Optional
+import functools
+import hashlib
+import heapq
+from dataclasses import dataclass, field, fields
+from typing import Dict, List, Any, Optional, Union
 from pathlib import Path
+from itertools import chain
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
 import logging
-from agents.ui_analyzer import UIAnalyzer
-from utils.llm_client import LLMClient
+import aiohttp
 from utils.config import config
-from generators.test_generator import TestGenerator
-from generators.api_test_generator import APITestGenerator
-from generators.load_test_generator import LoadTestGenerator
-from automation.playwright_runner import PlaywrightRunner
-from automation.visual_testing import VisualTester
+from utils import json_utils
+from utils.llm_cache import LLMCache
 import warnings
 warnings.filterwarnings("ignore", category=ResourceWarning, message="unclosed transport")
 
+try:
+    import msgspec
+except ImportError:  # msgspec is optional; suites then load through json_utils
+    msgspec = None
+
 logger = logging.getLogger(__name__)
 
+if msgspec is not None:
+    class TestSuite(msgspec.Struct):
+        """Typed view of a generated test suite"""
+        functional_tests: List[Dict[str, Any]] = []
+        api_tests: List[Any] = []
+        load_tests: Union[str, List[Any]] = []
+        visual_tests: List[Dict[str, Any]] = []
+        accessibility_tests: List[Dict[str, Any]] = []
+
+    def _decode_test_suite(data: bytes) -> "TestSuite":
+        return msgspec.json.decode(data, type=TestSuite)
+
+    def _to_test_suite(suite: Union["TestSuite", Dict[str, Any]]) -> "TestSuite":
+        return suite if isinstance(suite, TestSuite) else msgspec.convert(suite, TestSuite)
+else:
+    @dataclass
+    class TestSuite:
+        """Typed view of a generated test suite"""
+        functional_tests: List[Dict[str, Any]] = field(default_factory=list)
+        api_tests: List[Any] = field(default_factory=list)
+        load_tests: Union[str, List[Any]] = field(default_factory=list)
+        visual_tests: List[Dict[str, Any]] = field(default_factory=list)
+        accessibility_tests: List[Dict[str, Any]] = field(default_factory=list)
+
+    def _decode_test_suite(data: bytes) -> "TestSuite":
+        return _to_test_suite(json_utils.loads(data))
+
+    def _to_test_suite(suite: Union["TestSuite", Dict[str, Any]]) -> "TestSuite":
+        if isinstance(suite, TestSuite):
+            return suite
+        names = {f.name for f in fields(TestSuite)}
+        return TestSuite(**{key: value for key, value in suite.items() if key in names})
+
+# Query parameters that only track the visitor and never change page content
+_TRACKING_PARAMS = {"gclid", "fbclid", "msclkid", "mc_cid", "mc_eid", "ref", "_ga"}
+
+def _canonicalize_url(url: str) -> str:
+    """Normalize a URL so trivially different links to the same page compare equal"""
+    parts = urlsplit(url)
+    query = [
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key not in _TRACKING_PARAMS and not key.startswith("utm_")
+    ]
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(query), ""))
+
 class TestAgent:
-    def __init__(self):
-        self.ui_analyzer = UIAnalyzer()
-        self.llm_client = LLMClient()
-        self.test_generator = TestGenerator()
-        self.api_test_generator = APITestGenerator()
-        self.load_test_generator = LoadTestGenerator()
-        self.playwright_runner = PlaywrightRunner()
-        self.visual_tester = VisualTester()
+    def __init__(self, http_session: Optional[aiohttp.ClientSession] = None):
+        # Shared keep-alive HTTP session, owned by the caller and reused across runs
+        self.http_session = http_session
         
         self.session_id = None
         self.current_analysis = None
+        
+        # Last generated suite and the analysis key it was generated for
+        self._last_analysis_key: Optional[str] = None
+        self._last_suite: Optional[Dict[str, Any]] = None
+        # Complete suites by analysis key, expiring like cached LLM responses
+        self._suite_cache = (LLMCache(config.cache_dir / "suites", ttl=config.llm.cache_ttl)
+                             if config.llm.cache_enabled else None)
+
+    # Subcomponents pull in Playwright, OpenAI, OpenCV, etc., so build each on first use
+    @functools.cached_property
+    def ui_analyzer(self):
+        from agents.ui_analyzer import UIAnalyzer
+        return UIAnalyzer()
+
+    @functools.cached_property
+    def llm_client(self):
+        from utils.llm_client import LLMClient
+        return LLMClient()
+
+    @functools.cached_property
+    def test_generator(self):
+        from generators.test_generator import TestGenerator
+        return TestGenerator()
+
+    @functools.cached_property
+    def api_test_generator(self):
+        from generators.api_test_generator import APITestGenerator
+        return APITestGenerator(session=self.http_session)
+
+    @functools.cached_property
+    def load_test_generator(self):
+        from generators.load_test_generator import LoadTestGenerator
+        return LoadTestGenerator()
+
+    @functools.cached_property
+    def playwright_runner(self):
+        from automation.playwright_runner import PlaywrightRunner
+        return PlaywrightRunner()
+
+    @functools.cached_property
+    def visual_tester(self):
+        from automation.visual_testing import VisualTester
+        return VisualTester()
+
+    async def aclose(self) -> None:
+        """Release browsers held by subcomponents that were started"""
+        if "playwright_runner" in self.__dict__:
+            await self.playwright_runner.aclose()
+        if "visual_tester" in self.__dict__:
+            await self.visual_tester.aclose()
 
-    async def analyze_application(self, url: str) -> Dict[str, Any]:
+    async def analyze_application(self, url: str, own_browser: bool = True) -> Dict[str, Any]:
         """Comprehensive application analysis"""
         logger.info(f"Starting analysis of {url}")
         
         try:
-            # Initialize browser
-            await self.ui_analyzer.start_browser()
+            # Initialize browser; callers passing own_browser=False keep it alive between runs
+            if own_browser:
+                await self.ui_analyzer.start_browser()
+            else:
+                await self._ensure_browser()
             
             # Analyze main page
             main_analysis = await self.ui_analyzer.analyze_page(url)
             
-            # Discover additional pages
-            additional_pages = await self._discover_pages(url)
+            # Analyze discovered pages as they are found, each worker in its own browser context
+            workers = config.agent.max_concurrent_pages
+            queue: asyncio.Queue = asyncio.Queue(maxsize=workers * 2)
+            results: Dict[int, Dict[str, Any]] = {}
+            
+            async def _worker():
+                while True:
+                    item = await queue.get()
+                    if item is None:
+                        return
+                    index, page_url = item
+                    try:
+                        results[index] = await self.ui_analyzer.analyze_page(page_url)
+                    except Exception as e:
+                        logger.warning(f"Failed to analyze {page_url}: {e}")
+            
+            worker_tasks = [asyncio.ensure_future(_worker()) for _ in range(workers)]
+            try:
+                # Discover additional pages
+                await self._discover_pages(url, main_analysis, queue, limit=5)  # Limit to 5 additional pages
+            finally:
+                for _ in worker_tasks:
+                    await queue.put(None)
+                await asyncio.gather(*worker_tasks)
             
-            # Analyze discovered pages
+            # Keep discovery order regardless of which analysis finished first
             page_analyses = [main_analysis]
-            for page_url in additional_pages[:5]:  # Limit to 5 additional pages
-                try:
-                    analysis = await self.ui_analyzer.analyze_page(page_url)
-                    page_analyses.append(analysis)
-                except Exception as e:
-                    logger.warning(f"Failed to analyze {page_url}: {e}")
+            page_analyses.extend(results[index] for index in sorted(results))
             
             # Combine analyses
             combined_analysis = self._combine_page_analyses(page_analyses)
@@ -64,7 +181,13 @@ class TestAgent:
             logger.error(f"Error during application analysis: {e}")
             return {"error": str(e)}
         finally:
-            await self.ui_analyzer.stop_browser()
+            if own_browser:
+                await self.ui_analyzer.stop_browser()
+
+    async def _ensure_browser(self) -> None:
+        """Start the analyzer's browser unless it is already running"""
+        if not self.ui_analyzer.browser:
+            await self.ui_analyzer.start_browser()
 
     async def generate_test_suite(self, analysis: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Generate comprehensive test suite based on analysis"""
@@ -74,6 +197,18 @@ class TestAgent:
         if not analysis:
             raise ValueError("No analysis available. Please run analyze_application first.")
         
+        # Unchanged analyses reuse the suite generated for them last time
+        suite_key = self._analysis_key(analysis)
+        if suite_key == self._last_analysis_key and self._last_suite is not None:
+            return self._last_suite
+        
+        test_suite = await self._suite_cache.get(suite_key) if self._suite_cache else None
+        if test_suite is not None:
+            logger.info(f"Reusing test suite {suite_key[:12]}")
+            await self._save_test_suite(test_suite)
+            self._last_analysis_key, self._last_suite = suite_key, test_suite
+            return test_suite
+        
         logger.info("Generating test suite")
         
         # Generate different types of tests
@@ -86,21 +221,54 @@ class TestAgent:
         }
         
         try:
-            # Generate functional tests using LLM
-            for page in analysis.get("pages", []):
-                functional_tests = await self.llm_client.generate_test_cases(page)
-                test_suite["functional_tests"].extend(functional_tests)
+            # All LLM calls share one throttle sized to the provider's rate limit
+            sem = asyncio.Semaphore(config.llm.concurrency)
             
-            # Generate API tests if endpoints discovered
+            async def _throttled(call):
+                async with sem:
+                    return await call
+            
+            async def _noop(value):
+                return value
+            
+            pages = analysis.get("pages", [])
             api_endpoints = self._extract_api_endpoints(analysis)
-            if api_endpoints:
-                api_tests = await self.llm_client.generate_api_tests(api_endpoints)
+            user_flows = self._extract_user_flows(analysis)
+            
+            # Functional tests (pages batched per prompt), API tests and load tests have no data dependency
+            results = await asyncio.gather(
+                _throttled(self.llm_client.generate_api_tests(api_endpoints)) if api_endpoints else _noop([]),
+                _throttled(self.llm_client.generate_load_tests(user_flows)) if user_flows else _noop([]),
+                *[_throttled(self.llm_client.generate_test_cases_batch(batch))
+                  for batch in self.llm_client.split_batches(pages)],
+                return_exceptions=True
+            )
+            api_tests, load_test, page_batches = results[0], results[1], results[2:]
+            
+            # Generate functional tests using LLM; None marks a page whose generation failed
+            failed_pages = 0
+            for batch in page_batches:
+                if isinstance(batch, Exception):
+                    logger.warning(f"Failed to generate functional tests: {batch}")
+                    continue
+                for functional_tests in batch:
+                    if functional_tests is None:
+                        failed_pages += 1
+                        continue
+                    test_suite["functional_tests"].extend(functional_tests)
+            if failed_pages:
+                logger.warning(f"Functional test generation failed for {failed_pages} page(s)")
+            
+            # Generate API tests if endpoints discovered
+            if isinstance(api_tests, Exception):
+                logger.warning(f"Failed to generate API tests: {api_tests}")
+            else:
                 test_suite["api_tests"] = api_tests
             
             # Generate load tests
-            user_flows = self._extract_user_flows(analysis)
-            if user_flows:
-                load_test = await self.llm_client.generate_load_tests(user_flows)
+            if isinstance(load_test, Exception):
+                logger.warning(f"Failed to generate load tests: {load_test}")
+            else:
                 test_suite["load_tests"] = load_test
             
             # Generate visual regression tests
@@ -111,8 +279,13 @@ class TestAgent:
             accessibility_tests = self._generate_accessibility_tests(analysis)
             test_suite["accessibility_tests"] = accessibility_tests
             
-            # Save test suite
+            # Save test suite; only complete suites are reused for later runs
+            complete = (test_suite["functional_tests"] and not failed_pages
+                        and not any(isinstance(r, Exception) for r in results))
             await self._save_test_suite(test_suite)
+            if complete and self._suite_cache:
+                await self._suite_cache.set(suite_key, test_suite)
+                self._last_analysis_key, self._last_suite = suite_key, test_suite
             
             return test_suite
             
@@ -120,7 +293,7 @@ class TestAgent:
             logger.error(f"Error generating test suite: {e}")
             return {"error": str(e)}
 
-    async def execute_tests(self, test_suite: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    async def execute_tests(self, test_suite: Optional[Union[TestSuite, Dict[str, Any]]] = None) -> Dict[str, Any]:
         """Execute generated test suite"""
         if test_suite is None:
             # Load test suite from file
@@ -141,23 +314,38 @@ class TestAgent:
         }
         
         try:
+            # Validate the suite's shape once, then use plain attribute access
+            suite = _to_test_suite(test_suite)
+            
+            # Functional, API and visual executors share no state, so run them side by side
+            tasks = []
+            
             # Execute functional tests
-            if test_suite.get("functional_tests"):
-                results["functional_results"] = await self.playwright_runner.run_tests(
-                    test_suite["functional_tests"]
-                )
+            if suite.functional_tests:
+                tasks.append(("functional_results", self.playwright_runner.run_tests(
+                    suite.functional_tests
+                )))
             
             # Execute API tests
-            if test_suite.get("api_tests"):
-                results["api_results"] = await self.api_test_generator.execute_tests(
-                    test_suite["api_tests"]
-                )
+            if suite.api_tests:
+                tasks.append(("api_results", self.api_test_generator.execute_tests(
+                    suite.api_tests
+                )))
             
             # Execute visual tests
-            if test_suite.get("visual_tests"):
-                results["visual_results"] = await self.visual_tester.run_visual_tests(
-                    test_suite["visual_tests"]
-                )
+            if suite.visual_tests:
+                tasks.append(("visual_results", self.visual_tester.run_visual_tests(
+                    suite.visual_tests
+                )))
+            
+            if tasks:
+                keys, coros = zip(*tasks)
+                done = await asyncio.gather(*coros, return_exceptions=True)
+                for key, value in zip(keys, done):
+                    if isinstance(value, Exception):
+                        logger.error(f"Error executing {key.replace('_results', '')} tests: {value}")
+                        value = [{"status": "error", "error": str(value)}]
+                    results[key] = value
             
             # Generate summary
             results["summary"] = self._generate_test_summary(results)
@@ -175,83 +363,144 @@ class TestAgent:
         """Run continuous testing at specified intervals"""
         logger.info(f"Starting continuous testing for {url} every {interval} seconds")
         
-        baseline_analysis = None
+        # One browser for the whole run; each analysis only opens fresh contexts
+        await self._ensure_browser()
+        try:
+            baseline_analysis = None
+            last_fingerprints: Dict[str, Optional[str]] = {}
+            
+            while True:
+                try:
+                    # Cheap HTTP fingerprints first; only re-analyze when something changed
+                    if baseline_analysis is not None and last_fingerprints:
+                        fingerprints = await self._fingerprint_pages(list(last_fingerprints))
+                        if None not in fingerprints.values() and fingerprints == last_fingerprints:
+                            logger.info("No changes detected, skipping analysis")
+                            await asyncio.sleep(interval)
+                            continue
+                    
+                    # Analyze application
+                    current_analysis = await self.analyze_application(url, own_browser=False)
+                    page_urls = [page["url"] for page in current_analysis.get("pages", []) if page.get("url")]
+                    if "error" in current_analysis or not page_urls:
+                        # Neither fingerprint nor baseline a failed run, so the next iteration re-analyzes
+                        logger.warning(f"Analysis failed, retrying next iteration: {current_analysis.get('error', 'no pages analyzed')}")
+                        last_fingerprints = {}
+                        await asyncio.sleep(interval)
+                        continue
+                    
+                    # Fingerprints only describe a state that matches the baseline; a change
+                    # whose tests fail must be re-analyzed and re-tested next iteration
+                    if baseline_analysis is None:
+                        baseline_analysis = current_analysis
+                        last_fingerprints = await self._fingerprint_pages(page_urls)
+                        logger.info("Baseline analysis established")
+                    else:
+                        # Compare with baseline
+                        changes = self._detect_changes(baseline_analysis, current_analysis)
+                        if changes:
+                            logger.info(f"Changes detected: {changes}")
+                            
+                            # Generate and execute tests for changes
+                            test_suite = await self.generate_test_suite(current_analysis)
+                            results = await self.execute_tests(test_suite)
+                            
+                            # Update baseline if tests pass
+                            if self._tests_passed(results):
+                                baseline_analysis = current_analysis
+                                last_fingerprints = await self._fingerprint_pages(page_urls)
+                                logger.info("Baseline updated after successful tests")
+                            else:
+                                last_fingerprints = {}
+                        else:
+                            last_fingerprints = await self._fingerprint_pages(page_urls)
+                    
+                    # Wait for next iteration
+                    await asyncio.sleep(interval)
+                    
+                except Exception as e:
+                    logger.error(f"Error in continuous testing: {e}")
+                    await asyncio.sleep(60)  # Wait 1 minute before retry
+        finally:
+            await self.ui_analyzer.stop_browser()
+            await self.aclose()
+
+    async def _fingerprint_pages(self, urls: List[str]) -> Dict[str, Optional[str]]:
+        """Fingerprint pages concurrently over plain HTTP"""
+        owns_session = self.http_session is None
+        session = self.http_session or aiohttp.ClientSession()
         
-        while True:
-            try:
-                # Analyze application
-                current_analysis = await self.analyze_application(url)
-                
-                if baseline_analysis is None:
-                    baseline_analysis = current_analysis
-                    logger.info("Baseline analysis established")
-                else:
-                    # Compare with baseline
-                    changes = self._detect_changes(baseline_analysis, current_analysis)
-                    if changes:
-                        logger.info(f"Changes detected: {changes}")
-                        
-                        # Generate and execute tests for changes
-                        test_suite = await self.generate_test_suite(current_analysis)
-                        results = await self.execute_tests(test_suite)
-                        
-                        # Update baseline if tests pass
-                        if self._tests_passed(results):
-                            baseline_analysis = current_analysis
-                            logger.info("Baseline updated after successful tests")
-                
-                # Wait for next iteration
-                await asyncio.sleep(interval)
-                
-            except Exception as e:
-                logger.error(f"Error in continuous testing: {e}")
-                await asyncio.sleep(60)  # Wait 1 minute before retry
-
-    async def _discover_pages(self, base_url: str) -> List[str]:
-        """Discover additional pages to test"""
         try:
-            page = self.ui_analyzer.page
-            links = await page.evaluate("""
-                () => {
-                    const links = Array.from(document.querySelectorAll('a[href]'));
-                    return links.map(link => link.href).filter(href => 
-                        href.startsWith(window.location.origin) && 
-                        !href.includes('#') && 
-                        !href.includes('mailto:') &&
-                        !href.includes('tel:')
-                    );
-                }
-            """)
-            
-            # Remove duplicates and limit
-            unique_links = list(set(links))[:10]
-            return unique_links
+            fingerprints = await asyncio.gather(*[self._fingerprint(session, page_url) for page_url in urls])
+            return dict(zip(urls, fingerprints))
+        finally:
+            if owns_session:
+                await session.close()
+
+    async def _fingerprint(self, session: aiohttp.ClientSession, url: str) -> Optional[str]:
+        """Hash of a page's validators (ETag/Last-Modified/Content-Length), or of its body when absent"""
+        timeout = aiohttp.ClientTimeout(total=config.testing.api_testing.get("timeout", 10))
+        try:
+            async with session.head(url, allow_redirects=True, timeout=timeout) as response:
+                validators = [response.headers.get(name, "") for name in ("ETag", "Last-Modified", "Content-Length")]
+                if response.status < 400 and (validators[0] or validators[1]):
+                    return hashlib.blake2b("|".join(validators).encode(), digest_size=16).hexdigest()
+            
+            async with session.get(url, timeout=timeout) as response:
+                return hashlib.blake2b(await response.read(), digest_size=16).hexdigest()
+        except Exception as e:
+            logger.debug(f"Could not fingerprint {url}: {e}")
+            return None
+
+    async def _discover_pages(self, base_url: str, main_analysis: Dict[str, Any],
+                              queue: asyncio.Queue, limit: int = 10) -> int:
+        """Queue (index, url) for the highest scoring pages linked from the main page; returns how many"""
+        # Deduplicated on the canonical URL; the page is visited through its original href,
+        # since dropped slashes or query params can change what the server returns
+        scores: Dict[str, float] = {}
+        hrefs: Dict[str, str] = {}
+        try:
+            main_url = _canonicalize_url(main_analysis.get("page_info", {}).get("url") or base_url)
+            origin = urlsplit(main_url)[:2]
+            links = main_analysis.get("discoverable_links") or main_analysis.get("dom_elements", {}).get("links", [])
+            for link in links:
+                href = link.get("href", "")
+                if '#' in href or href.startswith(('mailto:', 'tel:')):
+                    continue
+                canonical = _canonicalize_url(href)
+                if canonical != main_url and urlsplit(canonical)[:2] == origin:
+                    score = float(link.get("score") or 0)
+                    if canonical not in scores or score > scores[canonical]:
+                        scores[canonical] = score
+                        hrefs[canonical] = href
+            
+            # Spend the page budget on the links most likely to yield tests; ties keep page order
+            selected = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+            for index, (canonical, _) in enumerate(selected):
+                # Blocks while the workers are busy, so discovery never runs far ahead
+                await queue.put((index, hrefs[canonical]))
+            return len(selected)
             
         except Exception as e:
             logger.error(f"Error discovering pages: {e}")
-            return []
+        
+        return 0
 
     def _combine_page_analyses(self, analyses: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Combine multiple page analyses into one comprehensive analysis"""
         combined = {
             "pages": analyses,
             "total_pages": len(analyses),
-            "forms": [],
+            # Aggregate data from all pages
+            "forms": list(chain.from_iterable(analysis.get("forms", []) for analysis in analyses)),
             "api_endpoints": [],
             "user_flows": [],
             "common_elements": {},
             "accessibility_issues": []
         }
         
-        # Aggregate data from all pages
-        for analysis in analyses:
-            if "forms" in analysis:
-                combined["forms"].extend(analysis["forms"])
-            
-            # Extract potential API endpoints from forms and AJAX calls
-            if "page_info" in analysis:
-                # This would need enhancement to detect actual API calls
-                pass
+        # Extract potential API endpoints from forms and AJAX calls
+        # This would need enhancement to detect actual API calls
         
         return combined
 
@@ -333,23 +582,28 @@ class TestAgent:
         
         return accessibility_tests
 
+    def _analysis_key(self, analysis: Dict[str, Any]) -> str:
+        """Content address of an analysis"""
+        data = json_utils.dumps(analysis, indent=False, sort_keys=True)
+        return hashlib.blake2b(data).hexdigest()[:16]
+
     async def _save_test_suite(self, test_suite: Dict[str, Any]) -> None:
-        """Save test suite to file"""
+        """Save test suite as the latest suite"""
         try:
             output_path = config.tests_dir / "generated_test_suite.json"
-            with open(output_path, 'w') as f:
-                json.dump(test_suite, f, indent=2)
+            data = json_utils.dumps(test_suite)
+            await asyncio.get_running_loop().run_in_executor(None, output_path.write_bytes, data)
             logger.info(f"Test suite saved to {output_path}")
         except Exception as e:
             logger.error(f"Error saving test suite: {e}")
 
-    async def _load_test_suite(self) -> Optional[Dict[str, Any]]:
+    async def _load_test_suite(self) -> Optional[TestSuite]:
         """Load test suite from file"""
         try:
             suite_path = config.tests_dir / "generated_test_suite.json"
             if suite_path.exists():
-                with open(suite_path, 'r') as f:
-                    return json.load(f)
+                data = await asyncio.get_running_loop().run_in_executor(None, suite_path.read_bytes)
+                return _decode_test_suite(data)
         except Exception as e:
             logger.error(f"Error loading test suite: {e}")
         return None
@@ -358,29 +612,41 @@ class TestAgent:
         """Save test results to file"""
         try:
             output_path = config.reports_dir / "test_results.json"
-            with open(output_path, 'w') as f:
-                json.dump(results, f, indent=2)
+            data = json_utils.dumps(results)
+            await asyncio.get_running_loop().run_in_executor(None, output_path.write_bytes, data)
             logger.info(f"Test results saved to {output_path}")
         except Exception as e:
             logger.error(f"Error saving test results: {e}")
 
+    def _page_digest(self, page: Dict[str, Any]) -> bytes:
+        """Structural hash of a page: its forms, their inputs and its headings"""
+        forms = sorted(
+            (form.get("action", ""), tuple(sorted(field.get("name", "") for field in form.get("inputs", []))))
+            for form in page.get("forms", [])
+        )
+        headings = sorted(heading.get("text", "") for heading in page.get("dom_elements", {}).get("headings", []))
+        return hashlib.blake2b(repr((page.get("url", ""), forms, headings)).encode(), digest_size=16).digest()
+
     def _detect_changes(self, baseline: Dict[str, Any], current: Dict[str, Any]) -> List[str]:
         """Detect changes between baseline and current analysis"""
         changes = []
         
-        # Compare number of pages
-        baseline_pages = len(baseline.get("pages", []))
-        current_pages = len(current.get("pages", []))
-        
-        if baseline_pages != current_pages:
-            changes.append(f"Page count changed: {baseline_pages} -> {current_pages}")
+        baseline_digests = {page["url"]: self._page_digest(page) for page in baseline.get("pages", []) if page.get("url")}
+        current_digests = {page["url"]: self._page_digest(page) for page in current.get("pages", []) if page.get("url")}
         
-        # Compare forms
-        baseline_forms = len(baseline.get("forms", []))
-        current_forms = len(current.get("forms", []))
+        added = current_digests.keys() - baseline_digests.keys()
+        removed = baseline_digests.keys() - current_digests.keys()
+        modified = [
+            url for url in current_digests.keys() & baseline_digests.keys()
+            if current_digests[url] != baseline_digests[url]
+        ]
         
-        if baseline_forms != current_forms:
-            changes.append(f"Form count changed: {baseline_forms} -> {current_forms}")
+        if added:
+            changes.append(f"Pages added: {sorted(added)}")
+        if removed:
+            changes.append(f"Pages removed: {sorted(removed)}")
+        if modified:
+            changes.append(f"Pages modified: {sorted(modified)}")
         
         return changes
 
@@ -391,22 +657,16 @@ class TestAgent:
 
     def _generate_test_summary(self, results: Dict[str, Any]) -> Dict[str, Any]:
         """Generate test execution summary"""
-        total_tests = 0
-        passed_tests = 0
-        failed_tests = 0
-        
         # Count results from all test types
-        for test_type, test_results in results.items():
-            if test_type == "summary":
-                continue
-            
-            if isinstance(test_results, list):
-                for result in test_results:
-                    total_tests += 1
-                    if result.get("status") == "passed":
-                        passed_tests += 1
-                    else:
-                        failed_tests += 1
+        statuses = [
+            result.get("status")
+            for test_type, test_results in results.items()
+            if test_type != "summary" and isinstance(test_results, list)
+            for result in test_results
+        ]
+        total_tests = len(statuses)
+        passed_tests = statuses.count("passed")
+        failed_tests = total_tests - passed_tests
         
         return {
             "total": total_tests,
@@ -1,25 +1,372 @@
 import asyncio
-from playwright.async_api import async_playwright, Page, Browser , TimeoutError
-from typing import Dict, List, Any, Optional
+import functools
+import hashlib
+import os
+import re
+from urllib.parse import urlsplit
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from collections import OrderedDict
+from playwright.async_api import async_playwright, Page, Browser , BrowserContext, TimeoutError
+from typing import Dict, List, Any, Optional, Tuple
 import logging
+import numpy as np
 from pathlib import Path
 from utils.config import config
 from utils.cv_utils import ComputerVisionUtils
+from utils.llm_cache import LLMCache
+from utils.browser_utils import capture_cdp_screenshot, clear_page_storage, install_resource_blocker
+from utils import json_utils
 import warnings
 warnings.filterwarnings("ignore", category=ResourceWarning)
 
 
 logger = logging.getLogger(__name__)
 
+# Analyses and CV detections are reused while the page (or screenshot) is unchanged
+_ANALYSIS_CACHE_SIZE = 128
+_ANALYSIS_CACHE_TTL = 30 * 24 * 60 * 60
+
+_UNSAFE_FILENAME_CHARS = re.compile(r"[^A-Za-z0-9._-]")
+
+@functools.lru_cache(maxsize=4096)
+def _screenshot_stem(url: str, version: str = "") -> str:
+    """Short readable prefix plus a hash of the full URL (and page version), unique and OS-safe"""
+    parts = urlsplit(url)
+    safe = _UNSAFE_FILENAME_CHARS.sub("_", parts.netloc + parts.path)[:60]
+    stem = f"{safe}_{hashlib.blake2b(url.encode('utf-8'), digest_size=8).hexdigest()}"
+    return f"{stem}_{version}" if version else stem
+
+# A few spawned workers are enough for per-page detection and stay cheap to start
+_CV_POOL_SIZE = min(4, os.cpu_count() or 1)
+
+def _bounds_array(bounds: Optional[List[Any]]) -> np.ndarray:
+    """Contiguous (N, 4) float32 [x, y, width, height] array of every DOM element record's box"""
+    return np.asarray(bounds or [], dtype=np.float32).reshape(-1, 4)
+
+_worker_cv_utils: Optional[ComputerVisionUtils] = None
+
+
+def _cv_worker(screenshot: bytes) -> List[Dict[str, Any]]:
+    """Detect UI elements in a CV worker process"""
+    global _worker_cv_utils
+    if _worker_cv_utils is None:
+        _worker_cv_utils = ComputerVisionUtils()
+    return _worker_cv_utils.detect_ui_elements_bytes(screenshot)
+
+# Page-side analysis helpers, installed once per browser context instead of
+# shipping each script over CDP on every evaluate call. collectAll walks the
+# DOM once and returns everything analyze_page needs in a single round-trip.
+_ANALYSIS_SCRIPT = """
+window.__aitAnalysis = {
+    domHash: () => {
+        const html = document.documentElement.outerHTML;
+        let hash = 0;
+        for (let i = 0; i < html.length; i++) {
+            hash = (hash * 31 + html.charCodeAt(i)) | 0;
+        }
+        return hash;
+    },
+
+    performance: () => {
+        const perfData = performance.getEntriesByType('navigation')[0];
+        return {
+            load_time: perfData.loadEventEnd - perfData.fetchStart,
+            dom_content_loaded: perfData.domContentLoadedEventEnd - perfData.fetchStart,
+            first_paint: performance.getEntriesByType('paint').find(p => p.name === 'first-paint')?.startTime || 0,
+            first_contentful_paint: performance.getEntriesByType('paint').find(p => p.name === 'first-contentful-paint')?.startTime || 0
+        };
+    },
+
+    pageInfo: () => {
+        return {
+            url: window.location.href,
+            title: document.title,
+            meta_description: document.querySelector('meta[name="description"]')?.content || '',
+            viewport: {
+                width: window.innerWidth,
+                height: window.innerHeight
+            },
+            scroll_height: document.body.scrollHeight,
+            has_jquery: typeof window.jQuery !== 'undefined'
+        };
+    },
+
+    // Element rects, read once per element per collection so overlapping
+    // categories don't force extra layout reads
+    rectCache: new WeakMap(),
+
+    rectOf: (el) => {
+        const cache = window.__aitAnalysis.rectCache;
+        let rect = cache.get(el);
+        if (!rect) {
+            const r = el.getBoundingClientRect();
+            rect = {
+                x: r.x,
+                y: r.y,
+                width: r.width,
+                height: r.height
+            };
+            cache.set(el, rect);
+        }
+        return rect;
+    },
+
+    clearRectCache: () => {
+        window.__aitAnalysis.rectCache = new WeakMap();
+        window.__aitAnalysis.styleCache = new WeakMap();
+    },
+
+    styleCache: new WeakMap(),
+
+    isVisible: (el) => {
+        const analysis = window.__aitAnalysis;
+        const rect = analysis.rectOf(el);
+        if (!(rect.width > 0 && rect.height > 0)) return false;
+        let style = analysis.styleCache.get(el);
+        if (!style) {
+            style = getComputedStyle(el);
+            analysis.styleCache.set(el, style);
+        }
+        return style.visibility !== 'hidden' && style.display !== 'none';
+    },
+
+    collectAll: () => {
+        const analysis = window.__aitAnalysis;
+        analysis.clearRectCache();
+        const elements = {
+            buttons: [],
+            inputs: [],
+            links: [],
+            forms: [],
+            images: [],
+            headings: []
+        };
+        const anchors = [];
+        const discoverableLinks = [];
+        const elementBounds = [];
+        const hrefCounts = new Map();
+        const labelledIds = new Set();
+        const textInputs = [];
+        const headingLevels = [];
+        const navigation = {
+            nav_count: 0,
+            menu_count: 0,
+            breadcrumb_count: 0,
+            has_mobile_menu: false
+        };
+        let imagesTotal = 0;
+        let imagesWithAlt = 0;
+        let hasSkipLink = false;
+
+        // Only visible elements are shipped back to Python; their boxes are also
+        // collected flat, x, y, width, height per element, for an (N, 4) array
+        const pushElement = (list, el, data) => {
+            if (!analysis.isVisible(el)) return;
+            const rect = data.bounds = analysis.rectOf(el);
+            elementBounds.push(rect.x, rect.y, rect.width, rect.height);
+            list.push(data);
+        };
+
+        // Single TreeWalker pass over the document, dispatching on tag
+        const walker = document.createTreeWalker(document.body || document.documentElement, NodeFilter.SHOW_ELEMENT);
+        let el;
+        while ((el = walker.nextNode())) {
+            const tag = el.tagName.toLowerCase();
+
+            if (tag === 'nav' || el.classList.length) {
+                if (el.matches('nav, .nav, .navbar, .navigation')) navigation.nav_count++;
+                if (el.matches('ul.menu, .dropdown, .menu')) navigation.menu_count++;
+                if (el.matches('.breadcrumb, .breadcrumbs')) navigation.breadcrumb_count++;
+                if (el.matches('.mobile-menu, .hamburger')) navigation.has_mobile_menu = true;
+            }
+
+            switch (tag) {
+                case 'button':
+                    pushElement(elements.buttons, el, {
+                        tag: tag,
+                        text: el.textContent?.trim() || el.value || '',
+                        id: el.id || '',
+                        class: el.className || ''
+                    });
+                    break;
+
+                case 'input':
+                case 'textarea':
+                case 'select':
+                    if (tag === 'input' && (el.type === 'button' || el.type === 'submit')) {
+                        pushElement(elements.buttons, el, {
+                            tag: tag,
+                            text: el.textContent?.trim() || el.value || '',
+                            id: el.id || '',
+                            class: el.className || ''
+                        });
+                    }
+                    pushElement(elements.inputs, el, {
+                        tag: tag,
+                        type: el.type || '',
+                        name: el.name || '',
+                        id: el.id || '',
+                        placeholder: el.placeholder || '',
+                        required: el.required || false
+                    });
+                    if (tag === 'textarea' || (tag === 'input' && (el.getAttribute('type') === 'text' || el.getAttribute('type') === 'email'))) {
+                        textInputs.push(el);
+                    }
+                    break;
+
+                case 'a':
+                    if (el.hasAttribute('href')) {
+                        anchors.push(el);
+                        hrefCounts.set(el.href, (hrefCounts.get(el.href) || 0) + 1);
+                        const href = el.getAttribute('href');
+                        if (href === '#main' || href === '#content') hasSkipLink = true;
+                    }
+                    break;
+
+                case 'form': {
+                    const formInputs = Array.from(el.querySelectorAll('input, textarea, select'));
+                    elements.forms.push({
+                        action: el.action || '',
+                        method: el.method || 'get',
+                        id: el.id || '',
+                        inputs_count: formInputs.length,
+                        inputs: formInputs.map(input => ({
+                            name: input.name || '',
+                            type: input.type || '',
+                            required: input.required || false,
+                            placeholder: input.placeholder || ''
+                        })),
+                        has_validation: el.querySelector('[required]') !== null,
+                        bounds: analysis.rectOf(el)
+                    });
+                    break;
+                }
+
+                case 'img':
+                    imagesTotal++;
+                    if (el.hasAttribute('alt')) imagesWithAlt++;
+                    pushElement(elements.images, el, {
+                        src: el.src || '',
+                        alt: el.alt || '',
+                        id: el.id || ''
+                    });
+                    break;
+
+                case 'h1':
+                case 'h2':
+                case 'h3':
+                case 'h4':
+                case 'h5':
+                case 'h6':
+                    headingLevels.push(parseInt(tag.charAt(1)));
+                    pushElement(elements.headings, el, {
+                        tag: tag,
+                        text: el.textContent?.trim() || '',
+                        id: el.id || ''
+                    });
+                    break;
+
+                case 'label':
+                    if (el.htmlFor) labelledIds.add(el.htmlFor);
+                    break;
+            }
+        }
+
+        // Links, scored by how much testable surface their context suggests. The regions
+        // holding a form or an input are collected once instead of queried per link
+        const regionSelector = 'form, section, article, main, aside, header, footer, nav';
+        const regionsContaining = (selector) => {
+            const regions = new Set();
+            for (const node of document.querySelectorAll(selector)) {
+                let region = node.parentElement?.closest(regionSelector);
+                while (region && !regions.has(region)) {
+                    regions.add(region);
+                    region = region.parentElement?.closest(regionSelector);
+                }
+                regions.add(document.body);
+            }
+            return regions;
+        };
+        const formRegions = regionsContaining('form');
+        const inputRegions = regionsContaining('input, textarea, select');
+        // Hidden anchors (collapsed menus, dropdowns) still lead to pages worth discovering,
+        // so every anchor is scored; only visible ones become element records
+        for (const el of anchors) {
+            const region = el.closest(regionSelector) || document.body;
+            const hasForm = !!el.closest('form') || formRegions.has(region);
+            const hasInputs = inputRegions.has(region);
+            const isInNav = !!el.closest('nav, .nav, .navbar, .navigation');
+            const score = (hasForm ? 3 : 0) + (hrefCounts.get(el.href) || 0) / 10 + (hasInputs ? 2 : 0) + (isInNav ? 1 : 0);
+            discoverableLinks.push({ href: el.href || '', score: score });
+            pushElement(elements.links, el, {
+                text: el.textContent?.trim() || '',
+                href: el.href || '',
+                id: el.id || '',
+                score: score
+            });
+        }
+
+        // Accessibility checks over what the pass collected
+        const issues = [];
+        const imagesWithoutAlt = imagesTotal - imagesWithAlt;
+        if (imagesWithoutAlt > 0) {
+            issues.push(`${imagesWithoutAlt} images missing alt text`);
+        }
+
+        const inputsWithoutLabels = textInputs.filter(input => {
+            return !input.getAttribute('aria-label') &&
+                   !(input.id && labelledIds.has(input.id)) &&
+                   !input.closest('label');
+        }).length;
+        if (inputsWithoutLabels > 0) {
+            issues.push(`${inputsWithoutLabels} form inputs missing labels`);
+        }
+
+        return {
+            title: document.title,
+            page_info: analysis.pageInfo(),
+            dom_elements: elements,
+            element_bounds: elementBounds,
+            discoverable_links: discoverableLinks,
+            navigation: navigation,
+            accessibility: {
+                issues: issues,
+                images_total: imagesTotal,
+                images_with_alt: imagesWithAlt,
+                heading_structure: headingLevels,
+                has_skip_link: hasSkipLink
+            }
+        };
+    }
+};
+"""
+
 class UIAnalyzer:
     def __init__(self):
         self.cv_utils = ComputerVisionUtils()
+        self.playwright = None
         self.browser: Optional[Browser] = None
-        self.page: Optional[Page] = None
+        self._browser_lock: Optional[asyncio.Lock] = None
+        self._contexts: List[BrowserContext] = []
+        self._context_pool: Optional[asyncio.Queue] = None
+        self._cv_pool: Optional[ProcessPoolExecutor] = None
+        self._cache: "OrderedDict[str, Any]" = OrderedDict()
+        self._disk_cache = LLMCache(config.cache_dir / "analysis", ttl=_ANALYSIS_CACHE_TTL)
+        self._jobs: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Future] = []
+        self._pending: Dict[str, asyncio.Future] = {}
 
     async def start_browser(self):
-        """Start browser instance"""
-        playwright = await async_playwright().start()
+        """Start browser instance; a no-op while one is running"""
+        if self._browser_lock is None:
+            self._browser_lock = asyncio.Lock()
+        async with self._browser_lock:
+            if not self.browser:
+                await self._launch()
+
+    async def _launch(self):
+        self.playwright = playwright = await async_playwright().start()
         
         if config.browser.type == "chromium":
             self.browser = await playwright.chromium.launch(
@@ -34,27 +381,76 @@ class UIAnalyzer:
                 headless=config.browser.headless
             )
         
-        self.page = await self.browser.new_page()
-        await self.page.set_viewport_size({
+        viewport = {
             "width": config.browser.viewport["width"],
             "height": config.browser.viewport["height"]
-        })
+        }
+        # Warm contexts with the cookies and local storage saved by the previous run
+        storage_state = None
+        if config.browser.persist_storage_state and self._storage_state_path().exists():
+            storage_state = str(self._storage_state_path())
+        
+        # Contexts are reused across analyses; the pool size bounds concurrent pages
+        self._context_pool = asyncio.Queue()
+        for _ in range(max(1, config.agent.max_concurrent_pages)):
+            context = await self.browser.new_context(viewport=viewport, storage_state=storage_state)
+            await context.add_init_script(_ANALYSIS_SCRIPT)
+            await install_resource_blocker(context, config.browser.block_resource_types, config.browser.block_analytics)
+            self._contexts.append(context)
+            self._context_pool.put_nowait(context)
+        
+        # Background workers drain enqueue()d URLs through the same browser
+        self._jobs = asyncio.Queue()
+        self._workers = [asyncio.ensure_future(self._worker_loop()) for _ in self._contexts]
+
 
+    def _storage_state_path(self) -> Path:
+        return config.cache_dir / "storage_state.json"
 
     async def stop_browser(self):
         """Stop browser instance"""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._jobs = None
+        for future in self._pending.values():
+            future.cancel()
+        self._pending = {}
+        
+        if config.browser.persist_storage_state and self._contexts:
+            try:
+                await self._contexts[0].storage_state(path=str(self._storage_state_path()))
+            except Exception as e:
+                logger.warning(f"Could not save browser storage state: {e}")
+        for context in self._contexts:
+            await context.close()
+        self._contexts = []
+        self._context_pool = None
+        if self._cv_pool:
+            self._cv_pool.shutdown()
+            self._cv_pool = None
         if self.browser:
             await self.browser.close()
+            self.browser = None
+        if self.playwright:
+            await self.playwright.stop()
+            self.playwright = None
 
-    async def analyze_page(self, url: str) -> Dict[str, Any]:
+    async def analyze_page(self, url: str, wait_strategy: Optional[str] = None) -> Dict[str, Any]:
         """Analyze a web page and extract UI information"""
+        context = page = None
         try:
-            if not self.page:
+            if not self.browser:
                 await self.start_browser()
             
+            # Each call borrows its own context, so concurrent analyses never share a page
+            context = await self._context_pool.get()
+            page = await context.new_page()
+            
             for attempt in range(3):
                 try:
-                    await self.page.goto(
+                    await page.goto(
                         url,
                         timeout=config.browser.timeout,
                         wait_until="domcontentloaded"
@@ -64,302 +460,225 @@ class UIAnalyzer:
                     print(f"⚠️ Timeout trying to load {url} (attempt {attempt+1}/3), retrying...")
                     if attempt == 2:
                         raise
-            await self.page.wait_for_load_state('networkidle')
+                    await asyncio.sleep(2 ** attempt)
+            await self._wait_until_ready(page, wait_strategy or config.browser.wait_strategy)
             
-            # Take screenshot
-            screenshot_path = await self._take_screenshot(url)
+            # Unchanged pages reuse their previous analysis and screenshot
+            dom_hash = await page.evaluate("window.__aitAnalysis.domHash()")
+            cache_key = hashlib.sha256(f"analysis:{url}:{dom_hash}".encode("utf-8")).hexdigest()
+            cached = await self._cache_get(cache_key)
+            if cached and Path(cached.get("screenshot", "")).exists():
+                # Disk cache entries hold the bounds as nested lists
+                return {**cached, "element_bounds": _bounds_array(cached.get("element_bounds"))}
             
-            # Extract page information
-            page_info = await self._extract_page_info()
-            
-            # Detect UI elements using computer vision
-            cv_elements = self.cv_utils.detect_ui_elements(screenshot_path)
+            # Screenshot while the DOM is collected in a single evaluate
+            # Naming the file after the DOM hash keeps cached paths pointing at their own capture
+            screenshot_task = asyncio.ensure_future(
+                self._take_screenshot(page, url, version=f"{dom_hash & 0xffffffff:08x}")
+            )
+            page_data = await self._collect_page_data(page)
+            screenshot_path, screenshot = await screenshot_task
             
-            # Extract DOM elements
-            dom_elements = await self._extract_dom_elements()
+            # Detection works on the captured bytes while the file is persisted
+            _, cv_elements = await asyncio.gather(
+                self._save_screenshot(screenshot_path, screenshot),
+                self._detect_ui_elements(screenshot)
+            )
+            element_bounds = _bounds_array(page_data.get("element_bounds"))
+            cv_elements = self.cv_utils.match_dom_elements(cv_elements, page_data.get("dom_elements", {}), dom_boxes=element_bounds)
             
             # Combine and analyze
             analysis = {
                 "url": url,
-                "title": await self.page.title(),
+                "title": page_data.get("title", ""),
                 "screenshot": screenshot_path,
-                "page_info": page_info,
+                "page_info": page_data.get("page_info", {}),
                 "cv_elements": cv_elements,
-                "dom_elements": dom_elements,
-                "forms": await self._analyze_forms(),
-                "navigation": await self._analyze_navigation(),
-                "accessibility": await self._analyze_accessibility()
+                "dom_elements": page_data.get("dom_elements", {}),
+                "element_bounds": element_bounds,
+                "discoverable_links": page_data.get("discoverable_links", []),
+                "forms": self._analyze_forms(page_data),
+                "navigation": page_data.get("navigation", {}),
+                "accessibility": page_data.get("accessibility", {})
             }
             
-            return analysis
+            if screenshot_path and page_data:
+                await self._cache_set(cache_key, analysis)
+            return dict(analysis)
             
         except Exception as e:
             logger.error(f"Error analyzing page {url}: {e}")
             return {"error": str(e)}
+        finally:
+            if context:
+                try:
+                    # Pooled contexts must not leak one site's state into the next analysis
+                    if page and not config.browser.persist_storage_state:
+                        await clear_page_storage(page)
+                    if page:
+                        await page.close()
+                    if not config.browser.persist_storage_state:
+                        await context.clear_cookies()
+                except Exception as e:
+                    logger.warning(f"Error resetting browser context: {e}")
+                if self._context_pool is not None:
+                    self._context_pool.put_nowait(context)
 
-    async def _take_screenshot(self, url: str) -> str:
-        """Take screenshot of current page"""
-        try:
-            # Create filename from URL
-            filename = url.replace("https://", "").replace("http://", "").replace("/", "_")
-            if not filename.endswith(".png"):
-                filename += ".png"
-            
-            screenshot_path = config.screenshots_dir / filename
-            await self.page.screenshot(path=str(screenshot_path), full_page=True)
-            
-            return str(screenshot_path)
-        except Exception as e:
-            logger.error(f"Error taking screenshot: {e}")
-            return ""
+    def to_json(self, analysis: Dict[str, Any]) -> bytes:
+        """Serialize an analysis (numpy values included) to compact JSON bytes"""
+        return json_utils.dumps(analysis, indent=False)
 
-    async def _extract_page_info(self) -> Dict[str, Any]:
-        """Extract basic page information"""
-        try:
-            return await self.page.evaluate("""
-                () => {
-                    return {
-                        url: window.location.href,
-                        title: document.title,
-                        meta_description: document.querySelector('meta[name="description"]')?.content || '',
-                        viewport: {
-                            width: window.innerWidth,
-                            height: window.innerHeight
-                        },
-                        scroll_height: document.body.scrollHeight,
-                        has_jquery: typeof window.jQuery !== 'undefined'
-                    };
-                }
-            """)
-        except Exception as e:
-            logger.error(f"Error extracting page info: {e}")
-            return {}
+    async def enqueue(self, url: str) -> asyncio.Future:
+        """Queue url for background analysis; await the returned future for its result"""
+        if not self.browser:
+            await self.start_browser()
+        
+        future = self._pending.get(url)
+        if future is None:
+            future = self._pending[url] = asyncio.get_running_loop().create_future()
+            self._jobs.put_nowait((url, future))
+        return future
+
+    async def _worker_loop(self) -> None:
+        """Analyze queued URLs until cancelled"""
+        while True:
+            url, future = await self._jobs.get()
+            try:
+                result = await self.analyze_page(url)
+                if not future.done():
+                    future.set_result(result)
+            finally:
+                self._pending.pop(url, None)
+                self._jobs.task_done()
 
-    async def _extract_dom_elements(self) -> Dict[str, List[Dict[str, Any]]]:
-        """Extract DOM elements for testing"""
+    async def _wait_until_ready(self, page: Page, wait_strategy: str) -> None:
+        """Wait until the page is ready for extraction"""
         try:
-            return await self.page.evaluate("""
-                () => {
-                    const elements = {
-                        buttons: [],
-                        inputs: [],
-                        links: [],
-                        forms: [],
-                        images: [],
-                        headings: []
-                    };
-                    
-                    // Extract buttons
-                    document.querySelectorAll('button, input[type="button"], input[type="submit"]').forEach(el => {
-                        const rect = el.getBoundingClientRect();
-                        elements.buttons.push({
-                            tag: el.tagName.toLowerCase(),
-                            text: el.textContent?.trim() || el.value || '',
-                            id: el.id || '',
-                            class: el.className || '',
-                            bounds: {
-                                x: rect.x,
-                                y: rect.y,
-                                width: rect.width,
-                                height: rect.height
-                            },
-                            visible: rect.width > 0 && rect.height > 0
-                        });
-                    });
-                    
-                    // Extract inputs
-                    document.querySelectorAll('input, textarea, select').forEach(el => {
-                        const rect = el.getBoundingClientRect();
-                        elements.inputs.push({
-                            tag: el.tagName.toLowerCase(),
-                            type: el.type || '',
-                            name: el.name || '',
-                            id: el.id || '',
-                            placeholder: el.placeholder || '',
-                            required: el.required || false,
-                            bounds: {
-                                x: rect.x,
-                                y: rect.y,
-                                width: rect.width,
-                                height: rect.height
-                            },
-                            visible: rect.width > 0 && rect.height > 0
-                        });
-                    });
-                    
-                    // Extract links
-                    document.querySelectorAll('a[href]').forEach(el => {
-                        const rect = el.getBoundingClientRect();
-                        elements.links.push({
-                            text: el.textContent?.trim() || '',
-                            href: el.href || '',
-                            id: el.id || '',
-                            bounds: {
-                                x: rect.x,
-                                y: rect.y,
-                                width: rect.width,
-                                height: rect.height
-                            },
-                            visible: rect.width > 0 && rect.height > 0
-                        });
-                    });
-                    
-                    // Extract forms
-                    document.querySelectorAll('form').forEach(el => {
-                        const rect = el.getBoundingClientRect();
-                        elements.forms.push({
-                            action: el.action || '',
-                            method: el.method || 'get',
-                            id: el.id || '',
-                            inputs_count: el.querySelectorAll('input, textarea, select').length,
-                            bounds: {
-                                x: rect.x,
-                                y: rect.y,
-                                width: rect.width,
-                                height: rect.height
-                            }
-                        });
-                    });
-                    
-                    // Extract images
-                    document.querySelectorAll('img').forEach(el => {
-                        const rect = el.getBoundingClientRect();
-                        elements.images.push({
-                            src: el.src || '',
-                            alt: el.alt || '',
-                            id: el.id || '',
-                            bounds: {
-                                x: rect.x,
-                                y: rect.y,
-                                width: rect.width,
-                                height: rect.height
-                            },
-                            visible: rect.width > 0 && rect.height > 0
-                        });
-                    });
-                    
-                    // Extract headings
-                    document.querySelectorAll('h1, h2, h3, h4, h5, h6').forEach(el => {
-                        const rect = el.getBoundingClientRect();
-                        elements.headings.push({
-                            tag: el.tagName.toLowerCase(),
-                            text: el.textContent?.trim() || '',
-                            id: el.id || '',
-                            bounds: {
-                                x: rect.x,
-                                y: rect.y,
-                                width: rect.width,
-                                height: rect.height
-                            },
-                            visible: rect.width > 0 && rect.height > 0
-                        });
-                    });
-                    
-                    return elements;
-                }
-            """)
-        except Exception as e:
-            logger.error(f"Error extracting DOM elements: {e}")
-            return {}
+            if wait_strategy == "networkidle":
+                await page.wait_for_load_state('networkidle')
+            else:
+                # Wait for load, then briefly for the app's own requests (SPAs render from
+                # them), without waiting out long-polls and analytics beacons
+                await page.wait_for_load_state('load', timeout=5000)
+                await page.wait_for_load_state('networkidle', timeout=2000)
+        except TimeoutError:
+            logger.debug(f"Page not ready after waiting ({wait_strategy}), continuing")
+
+    async def analyze_pages(self, urls: List[str], max_concurrency: int = 5) -> Dict[str, Any]:
+        """Analyze several pages concurrently; maps each URL to its analysis or exception"""
+        if not self.browser:
+            await self.start_browser()
+        
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def analyze_one(url: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.analyze_page(url)
+        
+        results = await asyncio.gather(*(analyze_one(url) for url in urls), return_exceptions=True)
+        return dict(zip(urls, results))
+
+    async def _detect_ui_elements(self, screenshot: bytes) -> List[Dict[str, Any]]:
+        """Detect UI elements using computer vision, cached by screenshot content"""
+        if not screenshot:
+            return []
+        
+        cache_key = hashlib.sha256(b"cv:" + screenshot).hexdigest()
+        cv_elements = await self._cache_get(cache_key)
+        if cv_elements is None:
+            # OpenCV work is CPU bound, so it runs in a process pool off the event loop
+            cv_elements = await asyncio.get_running_loop().run_in_executor(self._get_cv_pool(), _cv_worker, screenshot)
+            await self._cache_set(cache_key, cv_elements)
+        return cv_elements
 
-    async def _analyze_forms(self) -> List[Dict[str, Any]]:
-        """Analyze forms on the page"""
+    def _get_cv_pool(self) -> ProcessPoolExecutor:
+        """Process pool for OpenCV detection, started on first use"""
+        if self._cv_pool is None:
+            # spawn: forking a process that runs Playwright's and numba's threads is unsafe
+            self._cv_pool = ProcessPoolExecutor(max_workers=_CV_POOL_SIZE, mp_context=get_context("spawn"))
+        return self._cv_pool
+
+    async def _cache_get(self, key: str) -> Optional[Any]:
+        """Look key up in the in-memory LRU, then on disk"""
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+        
+        value = await self._disk_cache.get(key)
+        if value is not None:
+            self._remember(key, value)
+        return value
+
+    async def _cache_set(self, key: str, value: Any) -> None:
+        """Store value in memory and on disk"""
+        self._remember(key, value)
+        await self._disk_cache.set(key, value)
+
+    def _remember(self, key: str, value: Any) -> None:
+        self._cache[key] = value
+        self._cache.move_to_end(key)
+        while len(self._cache) > _ANALYSIS_CACHE_SIZE:
+            self._cache.popitem(last=False)
+
+    async def _take_screenshot(self, page: Page, url: str, full_page: Optional[bool] = None,
+                               image_type: Optional[str] = None, quality: Optional[int] = None,
+                               version: str = "") -> Tuple[str, bytes]:
+        """Capture a screenshot of the page; returns the path to save it under and the image bytes"""
         try:
-            forms = await self.page.query_selector_all('form')
-            form_analysis = []
+            full_page = config.browser.screenshot_full_page if full_page is None else full_page
+            image_type = image_type or config.browser.screenshot_type
+            extension = ".jpg" if image_type == "jpeg" else ".png"
             
-            for form in forms:
-                form_data = await form.evaluate("""
-                    (form) => {
-                        const inputs = Array.from(form.querySelectorAll('input, textarea, select')).map(input => ({
-                            name: input.name || '',
-                            type: input.type || '',
-                            required: input.required || false,
-                            placeholder: input.placeholder || ''
-                        }));
-                        
-                        return {
-                            action: form.action || '',
-                            method: form.method || 'get',
-                            inputs: inputs,
-                            has_validation: form.querySelector('[required]') !== null
-                        };
-                    }
-                """)
-                
-                form_analysis.append(form_data)
+            screenshot_path = config.screenshots_dir / f"{_screenshot_stem(url, version)}{extension}"
+            quality = config.browser.screenshot_quality if quality is None else quality
+            if config.browser.type == "chromium":
+                try:
+                    return str(screenshot_path), await capture_cdp_screenshot(page, full_page, image_type, quality)
+                except Exception as e:
+                    logger.debug(f"CDP screenshot failed, falling back to page.screenshot: {e}")
+            
+            options = {"type": image_type, "full_page": full_page}
+            if image_type == "jpeg":
+                options["quality"] = quality
             
-            return form_analysis
+            return str(screenshot_path), await page.screenshot(**options)
         except Exception as e:
-            logger.error(f"Error analyzing forms: {e}")
-            return []
+            logger.error(f"Error taking screenshot: {e}")
+            return "", b""
 
-    async def _analyze_navigation(self) -> Dict[str, Any]:
-        """Analyze navigation elements"""
+    async def _save_screenshot(self, screenshot_path: str, screenshot: bytes) -> None:
+        """Write screenshot bytes to disk"""
+        if not screenshot_path:
+            return
         try:
-            return await self.page.evaluate("""
-                () => {
-                    const nav_elements = document.querySelectorAll('nav, .nav, .navbar, .navigation');
-                    const menus = document.querySelectorAll('ul.menu, .dropdown, .menu');
-                    const breadcrumbs = document.querySelectorAll('.breadcrumb, .breadcrumbs');
-                    
-                    return {
-                        nav_count: nav_elements.length,
-                        menu_count: menus.length,
-                        breadcrumb_count: breadcrumbs.length,
-                        has_mobile_menu: document.querySelector('.mobile-menu, .hamburger') !== null
-                    };
-                }
-            """)
-        except Exception as e:
-            logger.error(f"Error analyzing navigation: {e}")
-            return {}
+            await asyncio.get_running_loop().run_in_executor(None, Path(screenshot_path).write_bytes, screenshot)
+        except OSError as e:
+            logger.error(f"Error saving screenshot {screenshot_path}: {e}")
 
-    async def _analyze_accessibility(self) -> Dict[str, Any]:
-        """Basic accessibility analysis"""
+    async def _collect_page_data(self, page: Page) -> Dict[str, Any]:
+        """Extract page info, DOM elements, navigation and accessibility in one round-trip"""
         try:
-            return await self.page.evaluate("""
-                () => {
-                    const issues = [];
-                    
-                    // Check for missing alt attributes
-                    const images_without_alt = document.querySelectorAll('img:not([alt])').length;
-                    if (images_without_alt > 0) {
-                        issues.push(`${images_without_alt} images missing alt text`);
-                    }
-                    
-                    // Check for missing form labels
-                    const inputs_without_labels = Array.from(document.querySelectorAll('input[type="text"], input[type="email"], textarea')).filter(input => {
-                        return !input.getAttribute('aria-label') && 
-                               !document.querySelector(`label[for="${input.id}"]`) &&
-                               !input.closest('label');
-                    }).length;
-                    
-                    if (inputs_without_labels > 0) {
-                        issues.push(`${inputs_without_labels} form inputs missing labels`);
-                    }
-                    
-                    // Check for heading structure
-                    const headings = Array.from(document.querySelectorAll('h1, h2, h3, h4, h5, h6'));
-                    const heading_levels = headings.map(h => parseInt(h.tagName.charAt(1)));
-                    
-                    return {
-                        issues: issues,
-                        images_total: document.querySelectorAll('img').length,
-                        images_with_alt: document.querySelectorAll('img[alt]').length,
-                        heading_structure: heading_levels,
-                        has_skip_link: document.querySelector('a[href="#main"], a[href="#content"]') !== null
-                    };
-                }
-            """)
+            return await page.evaluate("window.__aitAnalysis.collectAll()")
         except Exception as e:
-            logger.error(f"Error analyzing accessibility: {e}")
+            logger.error(f"Error collecting page data: {e}")
             return {}
 
-    async def capture_element_screenshot(self, selector: str) -> str:
-        """Capture screenshot of specific element"""
+    def _analyze_forms(self, page_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Analyze forms on the page, from the collected DOM data"""
+        return [
+            {
+                "action": form.get("action", ""),
+                "method": form.get("method", "get"),
+                "inputs": form.get("inputs", []),
+                "has_validation": form.get("has_validation", False)
+            }
+            for form in page_data.get("dom_elements", {}).get("forms", [])
+        ]
+
+    async def capture_element_screenshot(self, page: Page, selector: str) -> str:
+        """Capture screenshot of specific element on an already loaded page"""
         try:
-            element = await self.page.query_selector(selector)
+            element = await page.query_selector(selector)
             if element:
                 screenshot_path = config.screenshots_dir / f"element_{selector.replace(' ', '_')}.png"
                 await element.screenshot(path=str(screenshot_path))
@@ -368,20 +687,13 @@ class UIAnalyzer:
             logger.error(f"Error capturing element screenshot: {e}")
         return ""
 
-    async def get_page_performance(self) -> Dict[str, Any]:
-        """Get page performance metrics"""
+    async def get_page_performance(self, page: Page) -> Dict[str, Any]:
+        """Get performance metrics of an already loaded page"""
         try:
-            return await self.page.evaluate("""
-                () => {
-                    const perfData = performance.getEntriesByType('navigation')[0];
-                    return {
-                        load_time: perfData.loadEventEnd - perfData.fetchStart,
-                        dom_content_loaded: perfData.domContentLoadedEventEnd - perfData.fetchStart,
-                        first_paint: performance.getEntriesByType('paint').find(p => p.name === 'first-paint')?.startTime || 0,
-                        first_contentful_paint: performance.getEntriesByType('paint').find(p => p.name === 'first-contentful-paint')?.startTime || 0
-                    };
-                }
-            """)
+            # Pages from outside the analysis contexts lack the init script
+            if not await page.evaluate("!!window.__aitAnalysis"):
+                await page.evaluate(_ANALYSIS_SCRIPT)
+            return await page.evaluate("window.__aitAnalysis.performance()")
         except Exception as e:
             logger.error(f"Error getting performance metrics: {e}")
             return {}
\ No newline at end of file
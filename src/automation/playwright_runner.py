@@ -1,24 +1,210 @@
 import asyncio
 import json
-from typing import List, Dict, Any, Optional
-from playwright.async_api import async_playwright, Browser, Page
+import os
+import re
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import List, Dict, Any, Optional, Sequence
+from playwright.async_api import async_playwright, Browser, BrowserContext, Page, TimeoutError as PlaywrightTimeoutError
 import pytest
 import logging
 from pathlib import Path
+from itertools import groupby
+from urllib.parse import urlsplit
 from utils.config import config
+from utils.browser_utils import clear_page_storage, install_resource_blocker
+from utils.image_utils import encode_and_save, image_width
 import warnings
 warnings.filterwarnings("ignore", category=ResourceWarning, message="unclosed transport")
 
 logger = logging.getLogger(__name__)
 
+_URL_RE = re.compile(r'https?://[^\s]+')
+_PATH_RE = re.compile(r'/[^\s]*')
+_NUM_RE = re.compile(r'(\d+)')
+
+_BUTTON_SELECTORS = (
+    'button:visible',
+    'input[type="button"]:visible',
+    'input[type="submit"]:visible',
+    '[role="button"]:visible'
+)
+_SUBMIT_SELECTORS = (
+    'input[type="submit"]:visible',
+    'button[type="submit"]:visible',
+    'button:has-text("Submit"):visible',
+    'button:has-text("Send"):visible'
+)
+_CLICKABLE_SELECTORS = (
+    'button:visible',
+    'a:visible',
+    'input[type="button"]:visible',
+    'input[type="submit"]:visible'
+)
+
+
+# Page-side timings, measured by the browser rather than around Python awaits
+_COLLECT_PERFORMANCE = """
+async () => {
+    const perfData = performance.getEntriesByType('navigation')[0];
+    const paintEntries = performance.getEntriesByType('paint');
+
+    // LCP and layout shifts are only exposed to observers; buffered entries arrive as a task
+    const observed = (type) => new Promise(resolve => {
+        try {
+            const observer = new PerformanceObserver(list => {
+                observer.disconnect();
+                resolve(list.getEntries());
+            });
+            observer.observe({ type: type, buffered: true });
+            setTimeout(() => { observer.disconnect(); resolve([]); }, 100);
+        } catch (e) {
+            resolve([]);
+        }
+    });
+    const [lcpEntries, shiftEntries] = await Promise.all([
+        observed('largest-contentful-paint'),
+        observed('layout-shift')
+    ]);
+    const resources = performance.getEntriesByType('resource');
+
+    return {
+        timeToFirstByte: perfData.responseStart - perfData.requestStart,
+        domContentLoaded: perfData.domContentLoadedEventEnd - perfData.fetchStart,
+        loadComplete: perfData.loadEventEnd - perfData.fetchStart,
+        firstPaint: paintEntries.find(p => p.name === 'first-paint')?.startTime || 0,
+        firstContentfulPaint: paintEntries.find(p => p.name === 'first-contentful-paint')?.startTime || 0,
+        largestContentfulPaint: lcpEntries.length ? lcpEntries[lcpEntries.length - 1].startTime : 0,
+        cumulativeLayoutShift: shiftEntries.filter(e => !e.hadRecentInput).reduce((sum, e) => sum + e.value, 0),
+        transferSize: perfData.transferSize || 0,
+        resourceCount: resources.length,
+        resourceTransferSize: resources.reduce((sum, r) => sum + (r.transferSize || 0), 0),
+        domElements: document.getElementsByTagName('*').length
+    };
+}
+"""
+
+# Visible text-entry fields, remembered on window so _FILL_FIELDS fills exactly these
+_COLLECT_FILLABLE_FIELDS = """
+() => {
+    const unfillable = new Set(['checkbox', 'radio', 'file', 'submit', 'button', 'image', 'reset', 'hidden', 'range', 'color']);
+    const fields = Array.from(document.querySelectorAll('input, textarea')).filter(el => {
+        const rect = el.getBoundingClientRect();
+        return rect.width > 0 && rect.height > 0 &&
+               getComputedStyle(el).visibility !== 'hidden' &&
+               !el.disabled && !el.readOnly &&
+               !(el.tagName === 'INPUT' && unfillable.has(el.type));
+    });
+    window.__aitFillTargets = fields;
+    return fields.map(el => ({
+        type: el.getAttribute('type') || 'text',
+        name: el.getAttribute('name') || '',
+        placeholder: el.getAttribute('placeholder') || ''
+    }));
+}
+"""
+
+# Sets values through the native setter so framework-controlled inputs see the change
+_FILL_FIELDS = """
+(values) => {
+    const fields = window.__aitFillTargets || [];
+    fields.forEach((el, i) => {
+        if (!values[i]) return;
+        const setter = Object.getOwnPropertyDescriptor(Object.getPrototypeOf(el), 'value').set;
+        el.focus();
+        setter.call(el, values[i]);
+        el.dispatchEvent(new Event('input', { bubbles: true }));
+        el.dispatchEvent(new Event('change', { bubbles: true }));
+    });
+}
+"""
+
+# Step keywords in precedence order, mapped to the handler for that kind of step
+_STEP_KEYWORDS = (
+    ('navigate', '_navigate_step'),
+    ('go to', '_navigate_step'),
+    ('visit', '_navigate_step'),
+    ('click', '_click_step'),
+    ('fill', '_fill_step'),
+    ('enter', '_fill_step'),
+    ('type', '_fill_step'),
+    ('select', '_select_step'),
+    ('wait', '_wait_step'),
+    ('verify', '_verify_step'),
+    ('check', '_verify_step'),
+    ('assert', '_verify_step'),
+)
+_STEP_HANDLERS = dict(_STEP_KEYWORDS)
+_STEP_PRECEDENCE = {keyword: i for i, (keyword, _) in enumerate(_STEP_KEYWORDS)}
+# Lookahead alternation finds every (even overlapping) keyword in one scan
+_STEP_RE = re.compile('(?=(' + '|'.join(re.escape(keyword) for keyword, _ in _STEP_KEYWORDS) + '))')
+
+# (input types, name keywords, placeholder keywords, value), first match wins;
+# a None value means a person's name, refined by first/last below
+_TEST_VALUE_RULES = tuple(
+    (frozenset(types), frozenset(name_keywords), frozenset(placeholder_keywords), value)
+    for types, name_keywords, placeholder_keywords, value in (
+        (('email',), ('email',), ('email',), 'test@example.com'),
+        (('password',), ('password',), (), 'TestPassword123'),
+        (('tel',), ('phone',), ('tel',), '+1234567890'),
+        (('number',), ('age', 'quantity'), (), '25'),
+        (('date',), (), (), '2024-12-25'),
+        (('url',), (), (), 'https://example.com'),
+        ((), ('name',), ('name',), None),
+        ((), ('address',), ('address',), '123 Test Street'),
+        ((), ('city',), ('city',), 'Test City'),
+        ((), ('zip', 'postal'), (), '12345'),
+        ((), ('message', 'comment'), (), 'This is a test message for automated testing purposes.'),
+    )
+)
+_FIELD_RE = re.compile('(?=(' + '|'.join(sorted(
+    {keyword for _, name_keywords, placeholder_keywords, _ in _TEST_VALUE_RULES
+     for keyword in name_keywords | placeholder_keywords}
+)) + '))')
+
 class PlaywrightRunner:
+    """Runs tests on one long-lived browser, launched on first use and kept until aclose().
+
+    Do not instantiate per request; share one runner (or use it as an async
+    context manager) so repeated calls don't each pay for a browser launch.
+    """
+
     def __init__(self):
+        self.playwright = None
         self.browser: Optional[Browser] = None
+        # Page reused across tests when they run one at a time
         self.page: Optional[Page] = None
+        self._browser_lock: Optional[asyncio.Lock] = None
+        # Chromium takes one screenshot per browser at a time; queue here instead
+        # of piling requests onto it so other tests keep stepping meanwhile
+        self._screenshot_semaphore: Optional[asyncio.Semaphore] = None
+        # Worker processes for screenshots that need resizing or re-encoding
+        self._image_pool: Optional[ProcessPoolExecutor] = None
+        # Fillable field specs per page, dropped whenever the page navigates
+        self._field_cache: "weakref.WeakKeyDictionary[Page, List[Dict[str, str]]]" = weakref.WeakKeyDictionary()
+
+    async def __aenter__(self) -> "PlaywrightRunner":
+        await self._ensure_browser()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.aclose()
+
+    async def _ensure_browser(self) -> Browser:
+        """Launch the shared browser once, however many callers race for it"""
+        if self._browser_lock is None:
+            self._browser_lock = asyncio.Lock()
+        async with self._browser_lock:
+            if not self.browser:
+                await self.start_browser()
+        return self.browser
 
     async def start_browser(self):
-        """Initialize browser instance"""
-        playwright = await async_playwright().start()
+        """Initialize browser instance; a no-op while one is running"""
+        if self.browser:
+            return
+        self.playwright = playwright = await async_playwright().start()
         
         if config.browser.type == "chromium":
             self.browser = await playwright.chromium.launch(
@@ -35,24 +221,49 @@ class PlaywrightRunner:
 
     async def stop_browser(self):
         """Close browser instance"""
+        self.page = None
+        if self._image_pool:
+            self._image_pool.shutdown()
+            self._image_pool = None
         if self.browser:
             await self.browser.close()
+            self.browser = None
+        if self.playwright:
+            await self.playwright.stop()
+            self.playwright = None
+
+    async def aclose(self):
+        """Release the shared browser"""
+        await self.stop_browser()
 
     async def run_tests(self, test_cases: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Execute test cases using Playwright"""
         results = []
         
         try:
-            await self.start_browser()
+            await self._ensure_browser()
             
-            for i, test_case in enumerate(test_cases):
-                logger.info(f"Running test {i+1}/{len(test_cases)}: {test_case.get('name', 'Unknown')}")
-                
-                result = await self._run_single_test(test_case)
-                results.append(result)
-                
-                # Small delay between tests
-                await asyncio.sleep(1)
+            # Tests run concurrently, each in its own context on the shared browser
+            semaphore = asyncio.Semaphore(max(1, config.agent.max_parallel_tests))
+            
+            async def run_one(i: int, test_case: Dict[str, Any]) -> Dict[str, Any]:
+                async with semaphore:
+                    # Optional pacing for targets that can't take back-to-back tests; off by default
+                    if i and config.agent.inter_test_delay:
+                        await asyncio.sleep(config.agent.inter_test_delay)
+                    logger.info(f"Running test {i+1}/{len(test_cases)}: {test_case.get('name', 'Unknown')}")
+                    # A hung page must not stall the suite; cancelling closes its context
+                    try:
+                        return await asyncio.wait_for(self._run_single_test(test_case), timeout=config.agent.per_test_timeout)
+                    except asyncio.TimeoutError:
+                        logger.error(f"Test '{test_case.get('name', 'Unknown Test')}' timed out after {config.agent.per_test_timeout}s")
+                        return {
+                            "name": test_case.get('name', 'Unknown Test'),
+                            "status": "timeout",
+                            "error": f"Timed out after {config.agent.per_test_timeout}s"
+                        }
+            
+            results.extend(await asyncio.gather(*(run_one(i, test_case) for i, test_case in enumerate(test_cases))))
             
         except Exception as e:
             logger.error(f"Error running tests: {e}")
@@ -61,24 +272,23 @@ class PlaywrightRunner:
                 "status": "error",
                 "error": str(e)
             })
-        finally:
-            await self.stop_browser()
         
         return results
 
     async def _run_single_test(self, test_case: Dict[str, Any]) -> Dict[str, Any]:
         """Execute a single test case"""
         test_name = test_case.get('name', 'Unknown Test')
+        context = None
+        passed = False
         
         try:
-            # Create new page for each test
-            page = await self.browser.new_page()
-            
-            # Set viewport
-            await page.set_viewport_size(
-                width=config.browser.viewport["width"],
-                height=config.browser.viewport["height"]
-            )
+            if config.agent.max_parallel_tests <= 1:
+                # Sequential runs share one page, reset between tests instead of recreated
+                page = await self._shared_test_page()
+            else:
+                # Fresh context per test: isolated cookies/storage without a new browser process
+                context = await self._new_test_context()
+                page = await context.new_page()
             
             # Execute test steps
             for step_index, step in enumerate(test_case.get('steps', [])):
@@ -86,7 +296,6 @@ class PlaywrightRunner:
                     await self._execute_step(page, step, step_index)
                 except Exception as step_error:
                     logger.error(f"Step {step_index + 1} failed in test '{test_name}': {step_error}")
-                    await page.close()
                     return {
                         "name": test_name,
                         "status": "failed",
@@ -97,8 +306,7 @@ class PlaywrightRunner:
             # Take final screenshot
             screenshot_path = await self._take_test_screenshot(page, test_name)
             
-            await page.close()
-            
+            passed = True
             return {
                 "name": test_name,
                 "status": "passed",
@@ -113,111 +321,153 @@ class PlaywrightRunner:
                 "status": "failed",
                 "error": str(e)
             }
+        finally:
+            if context:
+                await context.close()
+            elif not passed:
+                # A failed or timed out test can leave the shared page mid-navigation or dialog
+                await self._recycle_shared_page()
+
+    async def _new_test_context(self) -> BrowserContext:
+        """Context for functional tests, with heavy resources blocked"""
+        context = await self.browser.new_context(viewport={
+            "width": config.browser.viewport["width"],
+            "height": config.browser.viewport["height"]
+        })
+        await install_resource_blocker(context, config.browser.test_block_resource_types, config.browser.block_analytics)
+        return context
+
+    async def _shared_test_page(self) -> Page:
+        """Return the reusable test page, blanked and with cookies and storage cleared"""
+        if self.page is not None and not self.page.is_closed():
+            try:
+                await clear_page_storage(self.page)
+                await self.page.goto('about:blank')
+                await self.page.context.clear_cookies()
+                return self.page
+            except Exception as e:
+                logger.warning(f"Could not reset the shared test page, recycling its context: {e}")
+                await self._recycle_shared_page()
+        
+        context = await self._new_test_context()
+        self.page = await context.new_page()
+        return self.page
+
+    async def _recycle_shared_page(self) -> None:
+        """Close the shared page's context so the next test starts from a fresh one"""
+        page, self.page = self.page, None
+        if page is not None:
+            try:
+                await page.context.close()
+            except Exception as e:
+                logger.debug(f"Error closing shared test context: {e}")
 
     async def _execute_step(self, page: Page, step: str, step_index: int):
         """Execute individual test step"""
         step_lower = step.lower()
         logger.info(f"Executing step {step_index + 1}: {step}")
         
-        if 'navigate' in step_lower or 'go to' in step_lower or 'visit' in step_lower:
-            # Extract URL from step or use default
-            url = self._extract_url_from_step(step)
-            if not url:
-                url = config.target_url
-            
-            await page.goto(url, timeout=config.browser.timeout)
-            await page.wait_for_load_state('networkidle')
+        keywords = _STEP_RE.findall(step_lower)
+        if not keywords:
+            logger.warning(f"Unknown step type: {step}")
+            return
         
-        elif 'click' in step_lower:
-            # Determine what to click
-            if 'button' in step_lower:
-                # Try different button selectors
-                selectors = [
-                    'button:visible',
-                    'input[type="button"]:visible',
-                    'input[type="submit"]:visible',
-                    '[role="button"]:visible'
-                ]
-                await self._click_first_available(page, selectors)
-            
-            elif 'link' in step_lower:
-                await page.click('a:visible', timeout=5000)
-            
-            elif 'submit' in step_lower:
-                selectors = [
-                    'input[type="submit"]:visible',
-                    'button[type="submit"]:visible',
-                    'button:has-text("Submit"):visible',
-                    'button:has-text("Send"):visible'
-                ]
-                await self._click_first_available(page, selectors)
-            
-            else:
-                # Generic clickable element
-                selectors = [
-                    'button:visible',
-                    'a:visible',
-                    'input[type="button"]:visible',
-                    'input[type="submit"]:visible'
-                ]
-                await self._click_first_available(page, selectors)
+        handler = _STEP_HANDLERS[min(keywords, key=_STEP_PRECEDENCE.__getitem__)]
+        if handler != "_fill_step":
+            # Any other step may change the form (navigation, SPA render, revealed fields)
+            self._field_cache.pop(page, None)
+        await getattr(self, handler)(page, step, step_lower)
+
+    async def _navigate_step(self, page: Page, step: str, step_lower: str):
+        # Extract URL from step or use default
+        url = self._extract_url_from_step(step)
+        if not url:
+            url = config.target_url
         
-        elif 'fill' in step_lower or 'enter' in step_lower or 'type' in step_lower:
-            # Fill form fields
-            await self._fill_form_fields(page, step)
+        await page.goto(url, timeout=config.browser.timeout)
+        await self._wait_ready(page)
+
+    async def _click_step(self, page: Page, step: str, step_lower: str):
+        # Determine what to click
+        if 'button' in step_lower:
+            # Try different button selectors
+            await self._click_first_available(page, _BUTTON_SELECTORS)
         
-        elif 'select' in step_lower:
-            # Handle select dropdowns
-            select_elements = await page.query_selector_all('select:visible')
-            if select_elements:
-                # Select first option in first select
-                await select_elements[0].select_option(index=1)
+        elif 'link' in step_lower:
+            await page.click('a:visible', timeout=5000)
         
-        elif 'wait' in step_lower:
-            # Wait for element or time
-            if 'second' in step_lower:
-                # Extract time from step
-                import re
-                match = re.search(r'(\d+)', step)
-                wait_time = int(match.group(1)) if match else 3
-                await asyncio.sleep(wait_time)
-            else:
-                # Wait for page load
-                await page.wait_for_load_state('networkidle')
+        elif 'submit' in step_lower:
+            await self._click_first_available(page, _SUBMIT_SELECTORS)
         
-        elif 'verify' in step_lower or 'check' in step_lower or 'assert' in step_lower:
-            # Verification steps
-            if 'text' in step_lower:
-                # Check if page contains expected text
-                content = await page.content()
-                if not any(word in content.lower() for word in ['success', 'complete', 'thank']):
-                    logger.warning("Expected success text not found")
-            
-            elif 'url' in step_lower:
-                # Check URL
-                current_url = page.url
-                logger.info(f"Current URL: {current_url}")
-            
-            else:
-                # Generic visibility check
-                try:
-                    await page.wait_for_selector('body', timeout=5000)
-                except:
-                    raise Exception("Page verification failed")
+        else:
+            # Generic clickable element
+            await self._click_first_available(page, _CLICKABLE_SELECTORS)
+
+    async def _fill_step(self, page: Page, step: str, step_lower: str):
+        # Fill form fields
+        await self._fill_form_fields(page, step)
+
+    async def _select_step(self, page: Page, step: str, step_lower: str):
+        # Handle select dropdowns
+        select_elements = await page.query_selector_all('select:visible')
+        if select_elements:
+            # Select first option in first select
+            await select_elements[0].select_option(index=1)
+
+    async def _wait_step(self, page: Page, step: str, step_lower: str):
+        # Wait for element or time
+        if 'second' in step_lower:
+            # Extract time from step
+            match = _NUM_RE.search(step)
+            wait_time = int(match.group(1)) if match else 3
+            await asyncio.sleep(wait_time)
+        else:
+            # Wait for page load
+            await self._wait_ready(page)
+
+    async def _verify_step(self, page: Page, step: str, step_lower: str):
+        # Verification steps
+        if 'text' in step_lower:
+            # Check if page contains expected text; only a boolean crosses the wire
+            found = await page.evaluate(
+                "(words) => { const text = (document.body ? document.body.innerText : '').toLowerCase();"
+                " return words.some(w => text.includes(w)); }",
+                ['success', 'complete', 'thank']
+            )
+            if not found:
+                logger.warning("Expected success text not found")
+        
+        elif 'url' in step_lower:
+            # Check URL
+            current_url = page.url
+            logger.info(f"Current URL: {current_url}")
         
         else:
-            logger.warning(f"Unknown step type: {step}")
+            # Generic visibility check
+            try:
+                await page.wait_for_selector('body', timeout=5000)
+            except:
+                raise Exception("Page verification failed")
 
-    async def _click_first_available(self, page: Page, selectors: List[str]):
+    async def _wait_ready(self, page: Page, hard_timeout: int = 2000):
+        """Wait for the DOM, then briefly for the network to settle without waiting out beacons"""
+        await page.wait_for_load_state('domcontentloaded')
+        try:
+            await page.wait_for_load_state('networkidle', timeout=hard_timeout)
+        except PlaywrightTimeoutError:
+            pass
+
+    async def _click_first_available(self, page: Page, selectors: Sequence[str]):
         """Click the first available element from selector list"""
+        # Selectors are in priority order; count() moves on at once when one matches nothing
         for selector in selectors:
+            locator = page.locator(selector)
             try:
-                element = await page.query_selector(selector)
-                if element:
-                    await element.click(timeout=5000)
+                if await locator.count():
+                    await locator.first.click(timeout=5000)
                     return
-            except:
-                continue
+            except Exception as e:
+                logger.debug(f"Click on {selector} failed, trying next selector: {e}")
         
         # If no specific selector worked, try generic approach
         try:
@@ -227,7 +477,26 @@ class PlaywrightRunner:
 
     async def _fill_form_fields(self, page: Page, step: str):
         """Fill form fields with test data"""
-        # Get all visible input fields
+        if config.browser.simulate_typing:
+            await self._type_form_fields(page)
+            return
+        
+        # Read every visible field's attributes in one round-trip, reused by consecutive fill steps
+        fields = self._field_cache.get(page)
+        if fields is None:
+            fields = self._field_cache[page] = await page.evaluate(_COLLECT_FILLABLE_FIELDS)
+        
+        # Determine test value based on field type/name/placeholder
+        values = [
+            self._get_test_value(field['type'], field['name'], field['placeholder'])
+            for field in fields
+        ]
+        
+        # ...and write them all back in one more
+        await page.evaluate(_FILL_FIELDS, values)
+
+    async def _type_form_fields(self, page: Page):
+        """Fill fields one by one through Playwright, for tests that exercise real input handling"""
         inputs = await page.query_selector_all('input:visible, textarea:visible')
         
         for input_elem in inputs:
@@ -235,7 +504,6 @@ class PlaywrightRunner:
             input_name = await input_elem.get_attribute('name') or ''
             input_placeholder = await input_elem.get_attribute('placeholder') or ''
             
-            # Determine test value based on field type/name/placeholder
             test_value = self._get_test_value(input_type, input_name, input_placeholder)
             
             if test_value:
@@ -250,60 +518,31 @@ class PlaywrightRunner:
         name_lower = name.lower()
         placeholder_lower = placeholder.lower()
         
-        if input_type == 'email' or 'email' in name_lower or 'email' in placeholder_lower:
-            return 'test@example.com'
-        
-        elif input_type == 'password' or 'password' in name_lower:
-            return 'TestPassword123'
-        
-        elif input_type == 'tel' or 'phone' in name_lower or 'tel' in placeholder_lower:
-            return '+1234567890'
-        
-        elif input_type == 'number' or 'age' in name_lower or 'quantity' in name_lower:
-            return '25'
-        
-        elif input_type == 'date':
-            return '2024-12-25'
+        # One scan per string collects every keyword present
+        name_hits = set(_FIELD_RE.findall(name_lower))
+        placeholder_hits = set(_FIELD_RE.findall(placeholder_lower))
         
-        elif input_type == 'url':
-            return 'https://example.com'
-        
-        elif 'name' in name_lower or 'name' in placeholder_lower:
-            if 'first' in name_lower or 'first' in placeholder_lower:
-                return 'John'
-            elif 'last' in name_lower or 'last' in placeholder_lower:
-                return 'Doe'
-            else:
+        for types, name_keywords, placeholder_keywords, value in _TEST_VALUE_RULES:
+            if input_type in types or name_hits & name_keywords or placeholder_hits & placeholder_keywords:
+                if value is not None:
+                    return value
+                if 'first' in name_lower or 'first' in placeholder_lower:
+                    return 'John'
+                elif 'last' in name_lower or 'last' in placeholder_lower:
+                    return 'Doe'
                 return 'John Doe'
         
-        elif 'address' in name_lower or 'address' in placeholder_lower:
-            return '123 Test Street'
-        
-        elif 'city' in name_lower or 'city' in placeholder_lower:
-            return 'Test City'
-        
-        elif 'zip' in name_lower or 'postal' in name_lower:
-            return '12345'
-        
-        elif 'message' in name_lower or 'comment' in name_lower:
-            return 'This is a test message for automated testing purposes.'
-        
-        else:
-            return 'Test Value'
+        return 'Test Value'
 
     def _extract_url_from_step(self, step: str) -> Optional[str]:
         """Extract URL from step description"""
-        import re
-        
         # Look for URL patterns
-        url_pattern = r'https?://[^\s]+'
-        match = re.search(url_pattern, step)
+        match = _URL_RE.search(step)
         if match:
             return match.group(0)
         
         # Look for relative paths
-        path_pattern = r'/[^\s]*'
-        match = re.search(path_pattern, step)
+        match = _PATH_RE.search(step)
         if match:
             return config.target_url.rstrip('/') + match.group(0)
         
@@ -312,24 +551,107 @@ class PlaywrightRunner:
     async def _take_test_screenshot(self, page: Page, test_name: str) -> str:
         """Take screenshot for test result"""
         try:
-            screenshot_name = f"test_{test_name.replace(' ', '_').lower()}.png"
+            image_type = config.browser.test_screenshot_type
+            extension = ".jpg" if image_type == "jpeg" else ".png"
+            screenshot_name = f"test_{test_name.replace(' ', '_').lower()}{extension}"
             screenshot_path = config.screenshots_dir / screenshot_name
             
-            await page.screenshot(path=str(screenshot_path), full_page=True)
+            quality = config.browser.test_screenshot_quality
+            options = {"type": image_type, "full_page": config.browser.test_screenshot_full_page}
+            if image_type == "jpeg":
+                options["quality"] = quality
+            
+            if self._screenshot_semaphore is None:
+                self._screenshot_semaphore = asyncio.Semaphore(1)
+            async with self._screenshot_semaphore:
+                data = await page.screenshot(**options)
+            
+            max_width = config.browser.test_screenshot_max_width
+            loop = asyncio.get_running_loop()
+            if image_type == "jpeg" and image_width(data) <= max_width:
+                # Nothing to resize, and re-encoding a JPEG would only lose quality
+                await loop.run_in_executor(None, screenshot_path.write_bytes, data)
+            else:
+                # Resize/recompress in a worker process, off the event loop
+                await loop.run_in_executor(
+                    self._get_image_pool(), encode_and_save, data, str(screenshot_path), image_type, quality, max_width
+                )
             return str(screenshot_path)
         
         except Exception as e:
             logger.error(f"Error taking screenshot: {e}")
             return ""
 
+    def _get_image_pool(self) -> ProcessPoolExecutor:
+        """Process pool for screenshot post-processing, started on first use"""
+        if self._image_pool is None:
+            # A small spawned pool: forking a process that runs Playwright's threads is unsafe
+            self._image_pool = ProcessPoolExecutor(max_workers=min(4, os.cpu_count() or 1), mp_context=get_context("spawn"))
+        return self._image_pool
+
+    async def batch_screenshot(self, specs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Screenshot many URLs; each spec has url, path and optional viewport/full_page"""
+        if config.browser.batch_screenshots:
+            # One warm page per origin, visited in turn, instead of a fresh page per shot
+            by_origin = sorted(range(len(specs)), key=lambda i: urlsplit(specs[i]["url"])[:2])
+            groups = [list(group) for _, group in groupby(by_origin, key=lambda i: urlsplit(specs[i]["url"])[:2])]
+        else:
+            groups = [[i] for i in range(len(specs))]
+        
+        # Each group opens its own context; bound them like the test fan-out
+        semaphore = asyncio.Semaphore(max(1, config.agent.max_parallel_tests))
+        
+        async def shoot(indices: List[int]) -> List[Dict[str, Any]]:
+            async with semaphore:
+                return await self._batch_shots([specs[i] for i in indices])
+        
+        results: List[Dict[str, Any]] = [{}] * len(specs)
+        for indices, shots in zip(groups, await asyncio.gather(*(shoot(indices) for indices in groups))):
+            for i, result in zip(indices, shots):
+                results[i] = result
+        return results
+
+    async def _batch_shots(self, specs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Take every screenshot in specs on one page"""
+        results = []
+        browser = await self._ensure_browser()
+        default_viewport = {
+            "width": config.browser.viewport["width"],
+            "height": config.browser.viewport["height"]
+        }
+        context = await browser.new_context(viewport=default_viewport)
+        try:
+            page = await context.new_page()
+            for spec in specs:
+                try:
+                    # Specs without a viewport get the configured one, not the previous spec's
+                    viewport = spec.get("viewport") or default_viewport
+                    if page.viewport_size != viewport:
+                        await page.set_viewport_size(viewport)
+                    await page.goto(spec["url"], timeout=config.browser.timeout)
+                    await self._wait_ready(page)
+                    
+                    if self._screenshot_semaphore is None:
+                        self._screenshot_semaphore = asyncio.Semaphore(1)
+                    async with self._screenshot_semaphore:
+                        await page.screenshot(path=str(spec["path"]), full_page=spec.get("full_page", False))
+                    results.append({"url": spec["url"], "status": "completed", "screenshot": str(spec["path"])})
+                except Exception as e:
+                    logger.error(f"Error taking screenshot of {spec.get('url')}: {e}")
+                    results.append({"url": spec.get("url"), "status": "error", "error": str(e)})
+        finally:
+            await context.close()
+        return results
+
     async def run_accessibility_tests(self, url: str) -> Dict[str, Any]:
         """Run basic accessibility tests"""
+        page = None
         try:
-            await self.start_browser()
-            page = await self.browser.new_page()
+            browser = await self._ensure_browser()
+            page = await browser.new_page()
             
             await page.goto(url)
-            await page.wait_for_load_state('networkidle')
+            await self._wait_ready(page)
             
             # Basic accessibility checks
             accessibility_results = await page.evaluate("""
@@ -337,45 +659,36 @@ class PlaywrightRunner:
                     const results = {
                         images_without_alt: 0,
                         forms_without_labels: 0,
-                        missing_headings: false,
+                        missing_headings: true,
                         color_contrast_issues: [],
                         keyboard_accessibility: true,
                         aria_issues: []
                     };
                     
-                    // Check images without alt text
-                    const images = document.querySelectorAll('img');
-                    images.forEach(img => {
-                        if (!img.alt || img.alt.trim() === '') {
-                            results.images_without_alt++;
-                        }
-                    });
-                    
-                    // Check form inputs without labels
-                    const inputs = document.querySelectorAll('input[type="text"], input[type="email"], textarea');
-                    inputs.forEach(input => {
-                        const hasLabel = input.labels && input.labels.length > 0;
-                        const hasAriaLabel = input.getAttribute('aria-label');
-                        const hasAriaLabelledby = input.getAttribute('aria-labelledby');
-                        
-                        if (!hasLabel && !hasAriaLabel && !hasAriaLabelledby) {
-                            results.forms_without_labels++;
+                    // Images, unlabelled inputs and headings counted in one pass over the DOM
+                    for (const el of document.getElementsByTagName('*')) {
+                        const tag = el.tagName;
+                        if (tag === 'IMG') {
+                            if (!el.alt || el.alt.trim() === '') {
+                                results.images_without_alt++;
+                            }
+                        } else if ((tag === 'INPUT' && (el.getAttribute('type') === 'text' || el.getAttribute('type') === 'email')) || tag === 'TEXTAREA') {
+                            const hasLabel = el.labels && el.labels.length > 0;
+                            const hasAriaLabel = el.getAttribute('aria-label');
+                            const hasAriaLabelledby = el.getAttribute('aria-labelledby');
+                            
+                            if (!hasLabel && !hasAriaLabel && !hasAriaLabelledby) {
+                                results.forms_without_labels++;
+                            }
+                        } else if (tag.length === 2 && tag[0] === 'H' && tag[1] >= '1' && tag[1] <= '6') {
+                            results.missing_headings = false;
                         }
-                    });
-                    
-                    // Check heading structure
-                    const headings = document.querySelectorAll('h1, h2, h3, h4, h5, h6');
-                    if (headings.length === 0) {
-                        results.missing_headings = true;
                     }
                     
                     return results;
                 }
             """)
             
-            await page.close()
-            await self.stop_browser()
-            
             return {
                 "status": "completed",
                 "results": accessibility_results,
@@ -389,45 +702,40 @@ class PlaywrightRunner:
                 "error": str(e),
                 "url": url
             }
+        finally:
+            if page:
+                await page.close()
 
     async def run_performance_test(self, url: str) -> Dict[str, Any]:
         """Run basic performance test"""
+        page = None
         try:
-            await self.start_browser()
-            page = await self.browser.new_page()
+            browser = await self._ensure_browser()
+            page = await browser.new_page()
             
-            # Measure page load performance
-            start_time = asyncio.get_event_loop().time()
-            await page.goto(url)
-            await page.wait_for_load_state('networkidle')
-            end_time = asyncio.get_event_loop().time()
+            # Chromium's own counters, when the browser speaks CDP
+            cdp = None
+            if config.browser.type == "chromium":
+                cdp = await page.context.new_cdp_session(page)
+                await cdp.send("Performance.enable")
             
-            load_time = end_time - start_time
+            await page.goto(url, timeout=config.browser.timeout)
+            await self._wait_ready(page)
             
-            # Get performance metrics
-            performance_metrics = await page.evaluate("""
-                () => {
-                    const perfData = performance.getEntriesByType('navigation')[0];
-                    const paintEntries = performance.getEntriesByType('paint');
-                    
-                    return {
-                        domContentLoaded: perfData.domContentLoadedEventEnd - perfData.fetchStart,
-                        loadComplete: perfData.loadEventEnd - perfData.fetchStart,
-                        firstPaint: paintEntries.find(p => p.name === 'first-paint')?.startTime || 0,
-                        firstContentfulPaint: paintEntries.find(p => p.name === 'first-contentful-paint')?.startTime || 0,
-                        transferSize: perfData.transferSize || 0,
-                        domElements: document.getElementsByTagName('*').length
-                    };
-                }
-            """)
+            # Navigation, paint, LCP, CLS and resource timings in one round-trip
+            performance_metrics = await page.evaluate(_COLLECT_PERFORMANCE)
             
-            await page.close()
-            await self.stop_browser()
+            browser_metrics = {}
+            if cdp:
+                response = await cdp.send("Performance.getMetrics")
+                browser_metrics = {metric["name"]: metric["value"] for metric in response.get("metrics", [])}
+                await cdp.detach()
             
             return {
                 "status": "completed",
-                "load_time": load_time,
+                "load_time": performance_metrics["loadComplete"] / 1000,
                 "metrics": performance_metrics,
+                "browser_metrics": browser_metrics,
                 "url": url
             }
             
@@ -437,4 +745,7 @@ class PlaywrightRunner:
                 "status": "error",
                 "error": str(e),
                 "url": url
-            }
\ No newline at end of file
+            }
+        finally:
+            if page:
+                await page.close()
\ No newline at end of file
@@ -1,22 +1,137 @@
 import asyncio
+import base64
+import functools
 import cv2
 import numpy as np
 from typing import List, Dict, Any, Optional, Tuple
 from pathlib import Path
 import logging
-from playwright.async_api import async_playwright, Browser, Page, Playwright
+from playwright.async_api import async_playwright, Browser, BrowserContext, Page, Playwright
 from utils.config import config
+from utils.browser_utils import capture_cdp_screenshot
 from utils.cv_utils import ComputerVisionUtils
 import warnings
 warnings.filterwarnings("ignore", category=ResourceWarning)
 
 logger = logging.getLogger(__name__)
 
+# Resolves once running animations finish, or after maxWait for infinite ones
+_WAIT_FOR_ANIMATIONS = """
+async (maxWait) => {
+    const animations = document.getAnimations ? document.getAnimations() : [];
+    if (!animations.length) return;
+    await Promise.race([
+        Promise.all(animations.map(a => a.finished.catch(() => {}))),
+        new Promise(resolve => setTimeout(resolve, maxWait))
+    ]);
+}
+"""
+
+_REPORT_HTML = """
+<!DOCTYPE html>
+<html>
+<head>
+    <title>Visual Regression Test Report</title>
+    <style>
+        body { font-family: Arial, sans-serif; margin: 20px; }
+        .test-result { border: 1px solid #ddd; margin: 20px 0; padding: 15px; }
+        .passed { border-left: 5px solid #4CAF50; }
+        .failed { border-left: 5px solid #f44336; }
+        .error { border-left: 5px solid #ff9800; }
+        .screenshot { max-width: 300px; margin: 10px; }
+        .comparison { display: flex; gap: 10px; }
+        .similarity { font-weight: bold; }
+        .high-similarity { color: #4CAF50; }
+        .low-similarity { color: #f44336; }
+    </style>
+</head>
+<body>
+    <h1>Visual Regression Test Report</h1>
+    <p>Generated on: {{ timestamp }}</p>
+    
+    <div class="summary">
+        <h2>Summary</h2>
+        <p>Total Tests: {{ total_tests }}</p>
+        <p>Passed: {{ passed_tests }}</p>
+        <p>Failed: {{ failed_tests }}</p>
+        <p>Errors: {{ error_tests }}</p>
+    </div>
+    
+    {% for result in results %}
+    <div class="test-result {{ result.status }}">
+        <h3>{{ result.name }}</h3>
+        <p><strong>URL:</strong> {{ result.url }}</p>
+        <p><strong>Status:</strong> {{ result.status }}</p>
+        
+        {% if result.similarity %}
+        <p><strong>Similarity:</strong> 
+            <span class="similarity {{ 'high-similarity' if result.similarity > 0.95 else 'low-similarity' }}">
+                {{ "%.2f"|format(result.similarity * 100) }}%
+            </span>
+        </p>
+        {% endif %}
+        
+        {% if result.current_screenshot %}
+        <div class="comparison">
+            {% if result.baseline_screenshot %}
+            <div>
+                <h4>Baseline</h4>
+                <img src="{{ result.baseline_screenshot }}" class="screenshot" alt="Baseline" loading="lazy">
+            </div>
+            {% endif %}
+            
+            <div>
+                <h4>Current</h4>
+                <img src="{{ result.current_screenshot }}" class="screenshot" alt="Current" loading="lazy">
+            </div>
+            
+            {% if result.diff_screenshot %}
+            <div>
+                <h4>Differences</h4>
+                <img src="{{ result.diff_screenshot }}" class="screenshot" alt="Diff" loading="lazy">
+            </div>
+            {% endif %}
+        </div>
+        {% endif %}
+        
+        {% if result.error %}
+        <p><strong>Error:</strong> {{ result.error }}</p>
+        {% endif %}
+    </div>
+    {% endfor %}
+</body>
+</html>
+"""
+
+@functools.lru_cache(maxsize=None)
+def _report_template():
+    """Parse and compile the report template once per process"""
+    from jinja2 import Template
+    return Template(_REPORT_HTML)
+
+def _thumbnail_data_uri(path: str, scale: float = 0.25) -> str:
+    """Downscaled JPEG of the image at path as a data URI; the path itself if it can't be read"""
+    img = cv2.imread(path) if path else None
+    if img is None:
+        return path
+    thumb = cv2.resize(img, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    ok, encoded = cv2.imencode('.jpg', thumb, [cv2.IMWRITE_JPEG_QUALITY, 80])
+    if not ok:
+        return path
+    return "data:image/jpeg;base64," + base64.b64encode(encoded.tobytes()).decode('ascii')
+
+def _decode_image(data: bytes) -> np.ndarray:
+    """Decode an encoded screenshot into a BGR image"""
+    return cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+
 class VisualTester:
+    """Visual regression runner; the browser stays up between calls until aclose()"""
+
     def __init__(self):
         self.cv_utils = ComputerVisionUtils()
         self.browser: Optional[Browser] = None
         self.playwright: Optional[Playwright] = None  # Add playwright instance
+        self._browser_lock: Optional[asyncio.Lock] = None
         self.baseline_dir = config.screenshots_dir / "baselines"
         self.current_dir = config.screenshots_dir / "current"
         self.diff_dir = config.screenshots_dir / "diffs"
@@ -25,13 +140,25 @@ class VisualTester:
         for dir_path in [self.baseline_dir, self.current_dir, self.diff_dir]:
             dir_path.mkdir(parents=True, exist_ok=True)
 
+    async def __aenter__(self) -> "VisualTester":
+        await self.start_browser()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.aclose()
+
     async def start_browser(self):
-        """Initialize browser for visual testing"""
-        self.playwright = await async_playwright().start()
-        self.browser = await self.playwright.chromium.launch(
-            headless=True,
-            args=['--disable-web-security', '--disable-dev-shm-usage', '--no-sandbox']
-        )
+        """Initialize browser for visual testing; a no-op while one is already running"""
+        if self._browser_lock is None:
+            self._browser_lock = asyncio.Lock()
+        async with self._browser_lock:
+            if self.browser:
+                return
+            self.playwright = await async_playwright().start()
+            self.browser = await self.playwright.chromium.launch(
+                headless=True,
+                args=['--disable-web-security', '--disable-dev-shm-usage', '--no-sandbox']
+            )
 
     async def stop_browser(self):
         """Stop browser and playwright"""
@@ -42,17 +169,34 @@ class VisualTester:
             await self.playwright.stop()
             self.playwright = None
 
-    async def run_visual_tests(self, visual_tests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Run visual regression tests"""
+    async def aclose(self):
+        """Release the browser kept alive across runs"""
+        await self.stop_browser()
+
+    async def _new_context(self) -> BrowserContext:
+        """Isolated context on the shared browser with the configured viewport"""
+        return await self.browser.new_context(viewport={
+            "width": config.browser.viewport["width"],
+            "height": config.browser.viewport["height"]
+        })
+
+    async def run_visual_tests(self, visual_tests: List[Dict[str, Any]],
+                               concurrency: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Run visual regression tests, at most `concurrency` (default agent.max_concurrent_pages) at once"""
         results = []
         
         try:
             await self.start_browser()
             
-            for test in visual_tests:
-                logger.info(f"Running visual test: {test.get('name', 'Unknown')}")
-                result = await self._run_single_visual_test(test)
-                results.append(result)
+            # Tests run concurrently, each in its own context on the shared browser
+            semaphore = asyncio.Semaphore(max(1, concurrency or config.agent.max_concurrent_pages))
+            
+            async def run_one(test: Dict[str, Any]) -> Dict[str, Any]:
+                async with semaphore:
+                    logger.info(f"Running visual test: {test.get('name', 'Unknown')}")
+                    return await self._run_single_visual_test(test)
+            
+            results.extend(await asyncio.gather(*(run_one(test) for test in visual_tests)))
                 
         except Exception as e:
             logger.error(f"Error running visual tests: {e}")
@@ -61,8 +205,6 @@ class VisualTester:
                 "status": "error",
                 "error": str(e)
             })
-        finally:
-            await self.stop_browser()
         
         return results
 
@@ -72,15 +214,10 @@ class VisualTester:
         url = test.get('url', config.target_url)
         test_type = test.get('type', 'full_page')
         
-        page = None
+        context = None
         try:
-            page = await self.browser.new_page()
-            
-            # Set consistent viewport - FIXED: Use correct method signature
-            await page.set_viewport_size({
-                "width": config.browser.viewport["width"],
-                "height": config.browser.viewport["height"]
-            })
+            context = await self._new_context()
+            page = await context.new_page()
 
             # Set timeouts - FIXED: Add proper timeout handling
             page.set_default_timeout(60000)  # 60 seconds
@@ -95,11 +232,14 @@ class VisualTester:
                 await page.goto(url, wait_until='domcontentloaded', timeout=60000)
                 await page.wait_for_load_state('networkidle', timeout=60000)
             
-            # Take current screenshot
-            current_screenshot = await self._take_screenshot(page, test_name, test_type)
+            # Take current screenshot; JPEG suffices once there is a PNG baseline to compare against
+            fast = test.get('fast_compare', config.testing.visual_regression.get('fast_compare', False))
+            current_screenshot, current_img = await self._take_screenshot(
+                page, test_name, test_type, fast=fast and self._baseline_path(test_name).exists()
+            )
             
             # Compare with baseline
-            comparison_result = await self._compare_with_baseline(test_name, current_screenshot)
+            comparison_result = await self._compare_with_baseline(test_name, current_screenshot, current_img)
             
             return {
                 "name": test_name,
@@ -120,37 +260,64 @@ class VisualTester:
                 "error": str(e)
             }
         finally:
-            if page:
-                await page.close()
+            if context:
+                await context.close()
+
+    async def _take_screenshot(self, page: Page, test_name: str, test_type: str,
+                               fast: bool = False) -> Tuple[str, np.ndarray]:
+        """Take screenshot based on test type; returns the saved path and the decoded image"""
+        stem = test_name.replace(' ', '_').lower()
+        
+        await self._wait_for_animations(page)
+        
+        # For element screenshots we'd need a selector; for now they default to viewport
+        full_page = test_type == 'full_page'
+        data = None
+        if fast:
+            # Chromium encodes (and OpenCV decodes) JPEG far faster than PNG
+            try:
+                quality = config.testing.visual_regression.get('fast_compare_quality', 90)
+                data = await capture_cdp_screenshot(page, full_page, "jpeg", quality)
+                screenshot_path = self.current_dir / f"{stem}.jpg"
+            except Exception as e:
+                logger.debug(f"CDP screenshot failed, falling back to PNG: {e}")
+        if data is None:
+            data = await page.screenshot(full_page=full_page)
+            screenshot_path = self.current_dir / f"{stem}.png"
+        
+        # Save the PNG as captured and decode it for comparison side by side
+        loop = asyncio.get_running_loop()
+        _, img = await asyncio.gather(
+            loop.run_in_executor(None, screenshot_path.write_bytes, data),
+            loop.run_in_executor(None, _decode_image, data)
+        )
+        
+        return str(screenshot_path), img
+
+    async def _wait_for_animations(self, page: Page, max_wait: int = 2000):
+        """Wait for running animations to settle instead of sleeping a fixed second"""
+        try:
+            await page.evaluate(_WAIT_FOR_ANIMATIONS, max_wait)
+        except Exception as e:
+            logger.debug(f"Animation wait unavailable, falling back to a short sleep: {e}")
+            await page.wait_for_timeout(250)
 
-    async def _take_screenshot(self, page: Page, test_name: str, test_type: str) -> str:
-        """Take screenshot based on test type"""
-        screenshot_name = f"{test_name.replace(' ', '_').lower()}.png"
-        screenshot_path = self.current_dir / screenshot_name
-        
-        # Wait a bit for any animations to complete
-        await page.wait_for_timeout(1000)
-        
-        if test_type == 'full_page':
-            await page.screenshot(path=str(screenshot_path), full_page=True)
-        elif test_type == 'viewport':
-            await page.screenshot(path=str(screenshot_path), full_page=False)
-        elif test_type == 'element':
-            # For element screenshots, we'd need a selector
-            # For now, default to viewport
-            await page.screenshot(path=str(screenshot_path), full_page=False)
-        
-        return str(screenshot_path)
+    def _baseline_path(self, test_name: str) -> Path:
+        """Where the baseline screenshot for test_name lives"""
+        return self.baseline_dir / f"{test_name.replace(' ', '_').lower()}.png"
 
-    async def _compare_with_baseline(self, test_name: str, current_path: str) -> Dict[str, Any]:
+    async def _compare_with_baseline(self, test_name: str, current_path: str,
+                                     current_img: Optional[np.ndarray] = None) -> Dict[str, Any]:
         """Compare current screenshot with baseline"""
-        baseline_name = f"{test_name.replace(' ', '_').lower()}.png"
-        baseline_path = self.baseline_dir / baseline_name
+        baseline_path = self._baseline_path(test_name)
+        
+        # Image decoding, comparison and file copies run in the executor so other tests keep navigating
+        loop = asyncio.get_running_loop()
         
         if not baseline_path.exists():
             # First run - create baseline
             import shutil
-            shutil.copy(current_path, baseline_path)
+            await loop.run_in_executor(None, shutil.copy, current_path, baseline_path)
             
             return {
                 "passed": True,
@@ -160,8 +327,29 @@ class VisualTester:
                 "message": "Baseline screenshot created"
             }
         
-        # Compare images
-        comparison = self.cv_utils.compare_screenshots(str(baseline_path), current_path)
+        # Decode once; the comparison and the diff visualization share the images
+        baseline_img = await loop.run_in_executor(None, cv2.imread, str(baseline_path))
+        if current_img is None:
+            current_img = await loop.run_in_executor(None, cv2.imread, current_path)
+        
+        # Coarse pass on 1/16 of the pixels: when nothing moves there (no pixel past the
+        # diff mask's threshold of 30), the full-resolution comparison is skipped
+        if baseline_img is not None and current_img is not None and baseline_img.shape == current_img.shape:
+            mean_diff, max_diff = await loop.run_in_executor(
+                None, self.cv_utils.coarse_difference, baseline_img, current_img
+            )
+            if mean_diff < config.testing.visual_regression.get("coarse_diff_floor", 0.5) and max_diff <= 30:
+                return {
+                    "passed": True,
+                    "similarity": 1.0 - mean_diff / 255.0,
+                    "baseline_path": str(baseline_path),
+                    "diff_path": "",
+                    "differences_found": False
+                }
+        
+        comparison = await loop.run_in_executor(
+            None, self.cv_utils.compare_images, baseline_img, current_img, str(baseline_path)
+        )
         
         if "error" in comparison:
             return {
@@ -170,12 +358,16 @@ class VisualTester:
                 "baseline_path": str(baseline_path)
             }
         
-        # Create diff image if differences found
+        # Create diff image if differences found; for pages that barely match it adds nothing
         diff_path = ""
+        diff_floor = config.testing.visual_regression.get("diff_similarity_floor", 0.8)
         if comparison.get("differences_found", False):
-            diff_path = await self._create_diff_visualization(
-                str(baseline_path), current_path, test_name
-            )
+            if comparison.get("similarity", 0) >= diff_floor:
+                diff_path = await self._create_diff_visualization(
+                    baseline_img, current_img, test_name
+                )
+            else:
+                logger.info(f"Skipping diff for '{test_name}': similarity below {diff_floor}, see the raw screenshots")
         
         return {
             "passed": comparison.get("passed", False),
@@ -185,60 +377,42 @@ class VisualTester:
             "differences_found": comparison.get("differences_found", False)
         }
 
-    async def _create_diff_visualization(self, baseline_path: str, current_path: str, test_name: str) -> str:
+    async def _create_diff_visualization(self, baseline_img: np.ndarray, current_img: np.ndarray, test_name: str) -> str:
         """Create visual diff image"""
         try:
             diff_name = f"{test_name.replace(' ', '_').lower()}_diff.png"
             diff_path = self.diff_dir / diff_name
             
-            # Load images
-            baseline_img = cv2.imread(baseline_path)
-            current_img = cv2.imread(current_path)
-            
             if baseline_img is None or current_img is None:
                 return ""
             
-            # Ensure same size
-            if baseline_img.shape != current_img.shape:
-                current_img = cv2.resize(current_img, (baseline_img.shape[1], baseline_img.shape[0]))
-            
-            # Create side-by-side comparison
-            comparison_img = self._create_side_by_side_comparison(
-                baseline_img, current_img, test_name
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(
+                None, self._write_side_by_side_comparison, baseline_img, current_img, test_name, diff_path
             )
-            
-            cv2.imwrite(str(diff_path), comparison_img)
             return str(diff_path)
             
         except Exception as e:
             logger.error(f"Error creating diff visualization: {e}")
             return ""
 
+    def _write_side_by_side_comparison(self, baseline: np.ndarray, current: np.ndarray,
+                                       test_name: str, diff_path: Path) -> None:
+        """Render the side-by-side comparison and save it; safe to run off the event loop"""
+        # Ensure same size
+        current = self.cv_utils.match_size(current, baseline)
+        
+        cv2.imwrite(str(diff_path), self._create_side_by_side_comparison(baseline, current, test_name))
+
     def _create_side_by_side_comparison(self, baseline: np.ndarray, current: np.ndarray, test_name: str) -> np.ndarray:
         """Create side-by-side comparison image"""
-        height, width = baseline.shape[:2]
-        
-        # Create combined image
-        combined = np.zeros((height, width * 3, 3), dtype=np.uint8)
-        
-        # Place baseline on left
-        combined[:, :width] = baseline
-        
-        # Place current in middle
-        combined[:, width:width*2] = current
-        
-        # Create diff on right
-        diff = cv2.absdiff(baseline, current)
-        
-        # Enhance differences
-        gray_diff = cv2.cvtColor(diff, cv2.COLOR_BGR2GRAY)
-        _, mask = cv2.threshold(gray_diff, 30, 255, cv2.THRESH_BINARY)
+        width = baseline.shape[1]
         
         # Color differences in red
-        diff_colored = current.copy()
-        diff_colored[mask > 0] = [0, 0, 255]
+        diff_colored = self.cv_utils.highlight_differences(baseline, current)
         
-        combined[:, width*2:] = diff_colored
+        # Baseline, current and diff side by side
+        combined = cv2.hconcat([baseline, current, diff_colored])
         
         # Add labels
         font = cv2.FONT_HERSHEY_SIMPLEX
@@ -259,64 +433,65 @@ class VisualTester:
         try:
             await self.start_browser()
             
-            for i, url in enumerate(urls):
-                test_name = f"baseline_{i+1}"
-                logger.info(f"Creating baseline for {url}")
-                
-                page = None
-                try:
-                    page = await self.browser.new_page()
-                    
-                    # FIXED: Use correct method signature for viewport
-                    await page.set_viewport_size({
-                        "width": config.browser.viewport["width"],
-                        "height": config.browser.viewport["height"]
-                    })
-                    
-                    # Set timeouts
-                    page.set_default_timeout(60000)
-                    page.set_default_navigation_timeout(60000)
-                    
-                    try:
-                        await page.goto(url, wait_until='domcontentloaded', timeout=30000)
-                        await page.wait_for_load_state('networkidle', timeout=30000)
-                    except Exception as e:
-                        logger.warning(f"Retrying with longer timeout for {url}: {e}")
-                        await page.goto(url, wait_until='domcontentloaded', timeout=60000)
-                        await page.wait_for_load_state('networkidle', timeout=60000)
-                    
-                    # Wait a bit for animations
-                    await page.wait_for_timeout(1000)
-                    
-                    # Take screenshot
-                    baseline_name = f"{test_name}.png"
-                    baseline_path = self.baseline_dir / baseline_name
-                    
-                    await page.screenshot(path=str(baseline_path), full_page=True)
-                    
-                    results["created"].append({
-                        "url": url,
-                        "baseline_path": str(baseline_path),
-                        "test_name": test_name
-                    })
-                    
-                except Exception as e:
-                    logger.error(f"Failed to create baseline for {url}: {e}")
-                    results["failed"].append({
-                        "url": url,
-                        "error": str(e)
-                    })
-                finally:
-                    if page:
-                        await page.close()
+            semaphore = asyncio.Semaphore(max(1, config.agent.max_concurrent_pages))
+            
+            async def create_one(i: int, url: str) -> Dict[str, Any]:
+                async with semaphore:
+                    return await self._create_single_baseline(f"baseline_{i+1}", url)
+            
+            for baseline in await asyncio.gather(*(create_one(i, url) for i, url in enumerate(urls))):
+                results["failed" if "error" in baseline else "created"].append(baseline)
                     
         except Exception as e:
             logger.error(f"Error creating baseline suite: {e}")
-        finally:
-            await self.stop_browser()
         
         return results
 
+    async def _create_single_baseline(self, test_name: str, url: str) -> Dict[str, Any]:
+        """Capture one baseline screenshot"""
+        logger.info(f"Creating baseline for {url}")
+        
+        context = None
+        try:
+            context = await self._new_context()
+            page = await context.new_page()
+            
+            # Set timeouts
+            page.set_default_timeout(60000)
+            page.set_default_navigation_timeout(60000)
+            
+            try:
+                await page.goto(url, wait_until='domcontentloaded', timeout=30000)
+                await page.wait_for_load_state('networkidle', timeout=30000)
+            except Exception as e:
+                logger.warning(f"Retrying with longer timeout for {url}: {e}")
+                await page.goto(url, wait_until='domcontentloaded', timeout=60000)
+                await page.wait_for_load_state('networkidle', timeout=60000)
+            
+            await self._wait_for_animations(page)
+            
+            # Take screenshot
+            baseline_name = f"{test_name}.png"
+            baseline_path = self.baseline_dir / baseline_name
+            
+            await page.screenshot(path=str(baseline_path), full_page=True)
+            
+            return {
+                "url": url,
+                "baseline_path": str(baseline_path),
+                "test_name": test_name
+            }
+            
+        except Exception as e:
+            logger.error(f"Failed to create baseline for {url}: {e}")
+            return {
+                "url": url,
+                "error": str(e)
+            }
+        finally:
+            if context:
+                await context.close()
+
     async def run_cross_browser_visual_test(self, test: Dict[str, Any]) -> Dict[str, Any]:
         """Run visual test across multiple browsers"""
         browsers = ['chromium', 'firefox', 'webkit']
@@ -326,7 +501,8 @@ class VisualTester:
         try:
             playwright = await async_playwright().start()
             
-            for browser_name in browsers:
+            # Launch and test all browsers at once; each run is independent
+            async def run_in(browser_name: str) -> Dict[str, Any]:
                 browser = None
                 page = None
                 try:
@@ -362,22 +538,21 @@ class VisualTester:
                         await page.goto(test.get('url', config.target_url), wait_until='domcontentloaded', timeout=60000)
                         await page.wait_for_load_state('networkidle', timeout=60000)
                     
-                    # Wait for animations
-                    await page.wait_for_timeout(1000)
+                    await self._wait_for_animations(page)
                     
                     # Take screenshot
                     screenshot_name = f"{test.get('name', 'test')}_{browser_name}.png"
                     screenshot_path = self.current_dir / screenshot_name
                     await page.screenshot(path=str(screenshot_path), full_page=True)
                     
-                    results[browser_name] = {
+                    return {
                         "status": "success",
                         "screenshot": str(screenshot_path)
                     }
                     
                 except Exception as e:
                     logger.error(f"Error testing in {browser_name}: {e}")
-                    results[browser_name] = {
+                    return {
                         "status": "error",
                         "error": str(e)
                     }
@@ -386,6 +561,8 @@ class VisualTester:
                         await page.close()
                     if browser:
                         await browser.close()
+            
+            results.update(zip(browsers, await asyncio.gather(*(run_in(name) for name in browsers))))
         
             # Compare screenshots between browsers
             if len([r for r in results.values() if r.get('status') == 'success']) > 1:
@@ -410,6 +587,13 @@ class VisualTester:
         
         browsers = list(browser_screenshots.keys())
         
+        # Decode each screenshot once instead of once per pair, off the event loop
+        loop = asyncio.get_running_loop()
+        decoded = await asyncio.gather(*(
+            loop.run_in_executor(None, cv2.imread, browser_screenshots[browser]) for browser in browsers
+        ))
+        images = dict(zip(browsers, decoded))
+        
         for i in range(len(browsers)):
             for j in range(i + 1, len(browsers)):
                 browser1, browser2 = browsers[i], browsers[j]
@@ -417,9 +601,12 @@ class VisualTester:
                 comparison_key = f"{browser1}_vs_{browser2}"
                 
                 try:
-                    comparison = self.cv_utils.compare_screenshots(
-                        browser_screenshots[browser1],
-                        browser_screenshots[browser2]
+                    comparison = await loop.run_in_executor(
+                        None,
+                        self.cv_utils.compare_images,
+                        images[browser1],
+                        images[browser2],
+                        browser_screenshots[browser1]
                     )
                     
                     comparisons[comparison_key] = {
@@ -434,17 +621,14 @@ class VisualTester:
                         diff_path = self.diff_dir / diff_name
                         
                         # Create cross-browser diff
-                        baseline_img = cv2.imread(browser_screenshots[browser1])
-                        current_img = cv2.imread(browser_screenshots[browser2])
+                        baseline_img = images[browser1]
+                        current_img = images[browser2]
                         
                         if baseline_img is not None and current_img is not None:
-                            if baseline_img.shape != current_img.shape:
-                                current_img = cv2.resize(current_img, (baseline_img.shape[1], baseline_img.shape[0]))
-                            
-                            diff_img = self._create_side_by_side_comparison(
-                                baseline_img, current_img, f"{browser1} vs {browser2}"
+                            await loop.run_in_executor(
+                                None, self._write_side_by_side_comparison,
+                                baseline_img, current_img, f"{browser1} vs {browser2}", diff_path
                             )
-                            cv2.imwrite(str(diff_path), diff_img)
                             comparisons[comparison_key]["diff_image"] = str(diff_path)
                 
                 except Exception as e:
@@ -457,95 +641,23 @@ class VisualTester:
 
     def generate_visual_test_report(self, results: List[Dict[str, Any]]) -> str:
         """Generate HTML report for visual tests"""
-        html_template = """
-<!DOCTYPE html>
-<html>
-<head>
-    <title>Visual Regression Test Report</title>
-    <style>
-        body { font-family: Arial, sans-serif; margin: 20px; }
-        .test-result { border: 1px solid #ddd; margin: 20px 0; padding: 15px; }
-        .passed { border-left: 5px solid #4CAF50; }
-        .failed { border-left: 5px solid #f44336; }
-        .error { border-left: 5px solid #ff9800; }
-        .screenshot { max-width: 300px; margin: 10px; }
-        .comparison { display: flex; gap: 10px; }
-        .similarity { font-weight: bold; }
-        .high-similarity { color: #4CAF50; }
-        .low-similarity { color: #f44336; }
-    </style>
-</head>
-<body>
-    <h1>Visual Regression Test Report</h1>
-    <p>Generated on: {{ timestamp }}</p>
-    
-    <div class="summary">
-        <h2>Summary</h2>
-        <p>Total Tests: {{ total_tests }}</p>
-        <p>Passed: {{ passed_tests }}</p>
-        <p>Failed: {{ failed_tests }}</p>
-        <p>Errors: {{ error_tests }}</p>
-    </div>
-    
-    {% for result in results %}
-    <div class="test-result {{ result.status }}">
-        <h3>{{ result.name }}</h3>
-        <p><strong>URL:</strong> {{ result.url }}</p>
-        <p><strong>Status:</strong> {{ result.status }}</p>
-        
-        {% if result.similarity %}
-        <p><strong>Similarity:</strong> 
-            <span class="similarity {{ 'high-similarity' if result.similarity > 0.95 else 'low-similarity' }}">
-                {{ "%.2f"|format(result.similarity * 100) }}%
-            </span>
-        </p>
-        {% endif %}
-        
-        {% if result.current_screenshot %}
-        <div class="comparison">
-            {% if result.baseline_screenshot %}
-            <div>
-                <h4>Baseline</h4>
-                <img src="{{ result.baseline_screenshot }}" class="screenshot" alt="Baseline">
-            </div>
-            {% endif %}
-            
-            <div>
-                <h4>Current</h4>
-                <img src="{{ result.current_screenshot }}" class="screenshot" alt="Current">
-            </div>
-            
-            {% if result.diff_screenshot %}
-            <div>
-                <h4>Differences</h4>
-                <img src="{{ result.diff_screenshot }}" class="screenshot" alt="Diff">
-            </div>
-            {% endif %}
-        </div>
-        {% endif %}
-        
-        {% if result.error %}
-        <p><strong>Error:</strong> {{ result.error }}</p>
-        {% endif %}
-    </div>
-    {% endfor %}
-</body>
-</html>
-"""
-        
-        from jinja2 import Template
         from datetime import datetime
         
-        template = Template(html_template)
-        
         # Calculate summary
         total_tests = len(results)
         passed_tests = sum(1 for r in results if r.get('status') == 'passed')
         failed_tests = sum(1 for r in results if r.get('status') == 'failed')
         error_tests = sum(1 for r in results if r.get('status') == 'error')
         
-        html_content = template.render(
-            results=results,
+        # Embed small thumbnails so opening the report doesn't decode every full-size screenshot
+        screenshot_keys = ('baseline_screenshot', 'current_screenshot', 'diff_screenshot')
+        report_results = [
+            {**r, **{key: _thumbnail_data_uri(r[key]) for key in screenshot_keys if r.get(key)}}
+            for r in results
+        ]
+        
+        html_content = _report_template().render(
+            results=report_results,
             timestamp=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
             total_tests=total_tests,
             passed_tests=passed_tests,
@@ -555,7 +667,6 @@ class VisualTester:
         
         # Save report
         report_path = config.reports_dir / 'visual_test_report.html'
-        with open(report_path, 'w') as f:
-            f.write(html_content)
+        report_path.write_text(html_content, encoding='utf-8')
         
         return str(report_path)
\ No newline at end of file
@@ -1,5 +1,6 @@
 import asyncio
 import json
+import re
 from typing import List, Dict, Any, Optional
 import aiohttp
 import pytest
@@ -11,9 +12,11 @@ warnings.filterwarnings("ignore", category=ResourceWarning, message="unclosed tr
 
 logger = logging.getLogger(__name__)
 
+_NON_IDENTIFIER_RE = re.compile(r'[^a-zA-Z0-9_]')
+
 class APITestGenerator:
-    def __init__(self):
-        self.session: Optional[aiohttp.ClientSession] = None
+    def __init__(self, session: Optional[aiohttp.ClientSession] = None):
+        self.session: Optional[aiohttp.ClientSession] = session
 
     async def generate_api_tests(self, endpoints: List[Dict[str, Any]]) -> str:
         """Generate API test code for given endpoints"""
@@ -31,9 +34,12 @@ logger = logging.getLogger(__name__)
 """
         
         fixtures = """
-@pytest.fixture
+@pytest.fixture(scope="session")
 async def api_session():
-    async with aiohttp.ClientSession() as session:
+    # One pooled keep-alive session for the whole run instead of a new connection per test
+    connector = aiohttp.TCPConnector(limit=100, limit_per_host=50, keepalive_timeout=60)
+    timeout = aiohttp.ClientTimeout(total=30)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
         yield session
 
 """
@@ -182,13 +188,12 @@ class Test{endpoint_name.title()}:
 
     def _sanitize_name(self, url: str) -> str:
         """Convert URL to valid Python identifier"""
-        import re
         # Remove protocol and domain
         name = url.split('/')[-1] if '/' in url else url
         # Remove query parameters
         name = name.split('?')[0]
         # Replace special characters
-        name = re.sub(r'[^a-zA-Z0-9_]', '_', name)
+        name = _NON_IDENTIFIER_RE.sub('_', name)
         # Remove leading/trailing underscores
         name = name.strip('_')
         # Ensure it doesn't start with a number
@@ -245,37 +250,43 @@ class Test{endpoint_name.title()}:
         """Discover API endpoints (basic implementation)"""
         endpoints = []
         
+        # Reuse the shared keep-alive session when one was provided
+        owns_session = self.session is None
+        session = self.session or aiohttp.ClientSession()
+        
         try:
-            async with aiohttp.ClientSession() as session:
-                # Try common API paths
-                common_paths = [
-                    '/api', '/api/v1', '/api/v2',
-                    '/rest', '/graphql',
-                    '/health', '/status',
-                    '/users', '/user', '/profile',
-                    '/products', '/product',
-                    '/orders', '/order'
-                ]
+            # Try common API paths
+            common_paths = [
+                '/api', '/api/v1', '/api/v2',
+                '/rest', '/graphql',
+                '/health', '/status',
+                '/users', '/user', '/profile',
+                '/products', '/product',
+                '/orders', '/order'
+            ]
+            
+            for path in common_paths:
+                test_url = base_url.rstrip('/') + path
                 
-                for path in common_paths:
-                    test_url = base_url.rstrip('/') + path
-                    
-                    try:
-                        async with session.get(test_url, timeout=5) as response:
-                            if response.status != 404:
-                                endpoints.append({
-                                    'url': test_url,
-                                    'method': 'GET',
-                                    'status': response.status,
-                                    'content_type': response.headers.get('content-type', '')
-                                })
-                    except asyncio.TimeoutError:
-                        continue
-                    except Exception:
-                        continue
+                try:
+                    async with session.get(test_url, timeout=5) as response:
+                        if response.status != 404:
+                            endpoints.append({
+                                'url': test_url,
+                                'method': 'GET',
+                                'status': response.status,
+                                'content_type': response.headers.get('content-type', '')
+                            })
+                except asyncio.TimeoutError:
+                    continue
+                except Exception:
+                    continue
         
         except Exception as e:
             logger.error(f"Error discovering endpoints: {e}")
+        finally:
+            if owns_session:
+                await session.close()
         
         return endpoints
 
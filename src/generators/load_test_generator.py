@@ -2,7 +2,6 @@ from typing import List, Dict, Any
 import logging
 from pathlib import Path
 from jinja2 import Template
-import subprocess
 import asyncio
 from utils.config import config
 import warnings
@@ -14,32 +13,54 @@ class LoadTestGenerator:
     def __init__(self):
         pass
 
-    def generate_locust_test(self, user_flows: List[Dict[str, Any]]) -> str:
-        """Generate Locust load test script"""
+    def generate_locust_test(self, user_flows: List[Dict[str, Any]],
+                             connection_timeout: float = 10.0,
+                             network_timeout: float = 30.0) -> str:
+        """Generate Locust load test script using FastHttpUser (keep-alive connections)"""
         
         # Updated template without problematic event listeners
         template_str = """
-from locust import HttpUser, task, between
-import random
+from locust import task, between
+from locust.contrib.fasthttp import FastHttpUser
+import atexit
+import gevent
 import json
-import time
 import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+class _RootForwarder(logging.Handler):
+    def emit(self, record):
+        logging.getLogger().handle(record)
+
+# Users log through a queue drained by one listener so greenlets never wait on handler I/O
+_log_queue = queue.SimpleQueue()
+_log_listener = QueueListener(_log_queue, _RootForwarder())
+_log_listener.start()
+atexit.register(_log_listener.stop)
 
 logger = logging.getLogger(__name__)
+logger.propagate = False
+logger.addHandler(QueueHandler(_log_queue))
 
-class WebsiteUser(HttpUser):
+class WebsiteUser(FastHttpUser):
+    # Random think time between tasks; each flow's own "wait" steps run inside its task
     wait_time = between({{ min_wait }}, {{ max_wait }})
+    connection_timeout = {{ connection_timeout }}
+    network_timeout = {{ network_timeout }}
+    default_headers = {
+        'User-Agent': 'LoadTest-Agent/1.0'
+    }
     
     def on_start(self):
         \"\"\"Called when a user starts\"\"\"
-        self.client.headers.update({
-            'User-Agent': 'LoadTest-Agent/1.0'
-        })
-        logger.info(f"User started")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("User started")
     
     def on_stop(self):
         \"\"\"Called when a user stops\"\"\"
-        logger.info(f"User stopped")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("User stopped")
 
 {% for flow in user_flows %}
     @task({{ flow.weight | default(1) }})
@@ -49,7 +70,7 @@ class WebsiteUser(HttpUser):
             {% for step in flow.steps %}
             # {{ step.description }}
             {% if step.action == 'visit' %}
-            with self.client.get("{{ step.url }}", catch_response=True) as response:
+            with self.client.get("{{ step.url }}", name="{{ step.url }}", catch_response=True) as response:
                 if response.status_code == 200:
                     response.success()
                 else:
@@ -74,7 +95,8 @@ class WebsiteUser(HttpUser):
                     logger.warning(f"GET {{ step.url }} returned {response.status_code}")
             
             {% elif step.action == 'wait' %}
-            time.sleep({{ step.duration | default(1) }})
+            # Yields to other users instead of blocking the worker
+            gevent.sleep({{ step.duration | default(1) }})
             
             {% elif step.action == 'api_call' %}
             {% if step.method == 'POST' %}
@@ -95,10 +117,6 @@ class WebsiteUser(HttpUser):
             {% endif %}
             
             {% endfor %}
-            
-            # Random think time
-            time.sleep(random.uniform(0.5, 2.0))
-            
         except Exception as e:
             logger.error(f"Error in {{ flow.method_name }}: {str(e)}")
 
@@ -136,7 +154,9 @@ class WebsiteUser(HttpUser):
         return template.render(
             user_flows=processed_flows,
             min_wait=1,
-            max_wait=5
+            max_wait=5,
+            connection_timeout=connection_timeout,
+            network_timeout=network_timeout
         )
 
     def _parse_step_string(self, step: str) -> Dict[str, Any]:
@@ -363,63 +383,79 @@ export function handleSummary(data) {
     def run_locust_test_sync(self, test_file: str, target_url: str, 
                             users: int = 10, spawn_rate: int = 2, 
                             duration: str = "60s") -> Dict[str, Any]:
-        """Run Locust load test synchronously"""
+        """Run Locust load test in-process through the runners API"""
+        try:
+            # Importing locust monkey-patches the interpreter with gevent, so keep it local
+            import gevent
+            from locust import stats
+            from locust.env import Environment
+            from locust.html import get_html_report
+            from locust.util.load_locustfile import load_locustfile
+            from locust.util.timespan import parse_timespan
+        except ImportError:
+            return {
+                'status': 'failed',
+                'error': 'Locust not found. Please install with: pip install locust'
+            }
+        
         try:
             # Ensure reports directory exists
             config.reports_dir.mkdir(parents=True, exist_ok=True)
             
-            cmd = [
-                'locust',
-                '-f', test_file,
-                '--host', target_url,
-                '--users', str(users),
-                '--spawn-rate', str(spawn_rate),
-                '-t', duration,
-                '--headless',
-                '--csv', str(config.reports_dir / 'load_test'),
-                '--html', str(config.reports_dir / 'load_test_report.html')
-            ]
+            user_classes, _ = load_locustfile(test_file)
+            if not user_classes:
+                return {
+                    'status': 'failed',
+                    'error': f'No Locust user classes found in {test_file}'
+                }
             
-            logger.info(f"Running Locust test: {' '.join(cmd)}")
+            logger.info(f"Running Locust test in-process: {test_file} against {target_url}")
             
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=300  # 5 minute timeout
+            env = Environment(user_classes=list(user_classes.values()), host=target_url)
+            runner = env.create_local_runner()
+            csv_writer = stats.StatsCSVFileWriter(
+                env, stats.PERCENTILES_TO_REPORT, str(config.reports_dir / 'load_test'), full_history=True
             )
+            gevent.spawn(stats.stats_history, runner)
+            gevent.spawn(csv_writer.stats_writer)
+            gevent.spawn_later(parse_timespan(duration), runner.quit)
             
-            if result.returncode == 0:
-                return {
-                    'status': 'completed',
-                    'reports': {
-                        'html': str(config.reports_dir / 'load_test_report.html'),
-                        'csv_stats': str(config.reports_dir / 'load_test_stats.csv'),
-                        'csv_history': str(config.reports_dir / 'load_test_stats_history.csv')
-                    },
-                    'stdout': result.stdout,
-                    'stderr': result.stderr
-                }
-            else:
+            runner.start(users, spawn_rate=spawn_rate)
+            runner.greenlet.join()
+            csv_writer.close_files()
+            
+            html_path = config.reports_dir / 'load_test_report.html'
+            with open(html_path, 'w', encoding='utf-8') as f:
+                f.write(get_html_report(env, show_download_link=False))
+            
+            total = env.stats.total
+            if not total.num_requests:
                 return {
                     'status': 'failed',
-                    'error': result.stderr or result.stdout or f'Process exited with code {result.returncode}',
-                    'stdout': result.stdout,
-                    'stderr': result.stderr,
-                    'return_code': result.returncode
+                    'error': f'No requests were made against {target_url} within {duration}'
                 }
-                
-        except subprocess.TimeoutExpired:
-            return {
-                'status': 'failed',
-                'error': 'Test timed out after 5 minutes'
-            }
-        except FileNotFoundError:
+            
             return {
-                'status': 'failed',
-                'error': 'Locust not found. Please install with: pip install locust'
+                'status': 'completed',
+                'stats': {
+                    'requests': total.num_requests,
+                    'failures': total.num_failures,
+                    'rps': total.total_rps,
+                    'fail_ratio': total.fail_ratio,
+                    'avg_response_time': total.avg_response_time,
+                    'median_response_time': total.median_response_time,
+                    'p95_response_time': total.get_response_time_percentile(0.95),
+                    'max_response_time': total.max_response_time
+                },
+                'reports': {
+                    'html': str(html_path),
+                    'csv_stats': str(config.reports_dir / 'load_test_stats.csv'),
+                    'csv_history': str(config.reports_dir / 'load_test_stats_history.csv')
+                }
             }
+                
         except Exception as e:
+            logger.error(f"Error running Locust test: {e}")
             return {
                 'status': 'failed',
                 'error': str(e)
@@ -3,6 +3,7 @@ import logging
 from pathlib import Path
 from jinja2 import Template
 from utils.config import config
+from utils.browser_utils import CLEAR_STORAGE_SCRIPT
 import warnings
 warnings.filterwarnings("ignore", category=ResourceWarning, message="unclosed transport")
 
@@ -271,18 +272,110 @@ asyncio_mode = auto
     def generate_conftest(self) -> str:
         """Generate pytest conftest file"""
         conftest_content = """
+import os
+import sys
 import pytest
 import asyncio
-from playwright.async_api import async_playwright
+from playwright.async_api import async_playwright, Browser, BrowserContext
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+CONTEXT_POOL_SIZE = int(os.getenv("CONTEXT_POOL_SIZE", "4"))
+CONTEXT_MAX_IDLE_TIME = float(os.getenv("CONTEXT_MAX_IDLE_TIME", "300"))
+
+# Origin storage that clear_cookies() leaves behind on a reused context
+CLEAR_STORAGE_SCRIPT = \"\"\"__CLEAR_STORAGE_SCRIPT__\"\"\"
+
+class ContextPool:
+    \"\"\"Pool of pre-warmed browser contexts shared by all tests in the session\"\"\"
+
+    def __init__(self, browser: Browser, pool_size: int = CONTEXT_POOL_SIZE,
+                 max_idle_time: float = CONTEXT_MAX_IDLE_TIME):
+        self.browser = browser
+        self.pool_size = pool_size
+        self.max_idle_time = max_idle_time
+        self._queue: "asyncio.Queue[tuple]" = asyncio.Queue()
+        self._cleanup_task = None
+
+    async def start(self):
+        \"\"\"Pre-create contexts and start the idle cleanup task\"\"\"
+        for _ in range(self.pool_size):
+            self._queue.put_nowait((await self._new_context(), self._now()))
+        self._cleanup_task = asyncio.create_task(self._cleanup())
+
+    async def acquire(self) -> BrowserContext:
+        \"\"\"Get a ready context, creating one if the pool is empty\"\"\"
+        try:
+            context, _ = self._queue.get_nowait()
+            return context
+        except asyncio.QueueEmpty:
+            return await self._new_context()
+
+    async def release(self, context: BrowserContext):
+        \"\"\"Reset a context and return it to the pool\"\"\"
+        for page in context.pages:
+            if page.url.startswith("http"):
+                try:
+                    await page.evaluate(CLEAR_STORAGE_SCRIPT)
+                except Exception as e:
+                    logger.warning(f"Could not clear page storage: {e}")
+            await page.close()
+        await context.clear_cookies()
+        if self._queue.qsize() < self.pool_size:
+            self._queue.put_nowait((context, self._now()))
+        else:
+            await context.close()
+
+    async def close(self):
+        \"\"\"Stop the cleanup task and close all pooled contexts\"\"\"
+        if self._cleanup_task:
+            self._cleanup_task.cancel()
+        while not self._queue.empty():
+            context, _ = self._queue.get_nowait()
+            await context.close()
+
+    async def _new_context(self) -> BrowserContext:
+        context = await self.browser.new_context()
+        # Warm up the renderer so the first test doesn't pay for it
+        page = await context.new_page()
+        await page.goto("about:blank")
+        await page.close()
+        return context
+
+    async def _cleanup(self):
+        \"\"\"Close contexts that have been idle longer than max_idle_time\"\"\"
+        while True:
+            await asyncio.sleep(self.max_idle_time / 2)
+            now = self._now()
+            idle = []
+            while not self._queue.empty():
+                idle.append(self._queue.get_nowait())
+            for context, released_at in idle:
+                if now - released_at > self.max_idle_time:
+                    await context.close()
+                else:
+                    self._queue.put_nowait((context, released_at))
+
+    @staticmethod
+    def _now() -> float:
+        return asyncio.get_running_loop().time()
+
 @pytest.fixture(scope="session")
 def event_loop():
     \"\"\"Create an instance of the default event loop for the test session.\"\"\"
-    loop = asyncio.get_event_loop_policy().new_event_loop()
+    if sys.platform == "win32":
+        # Playwright drives the browser over subprocess pipes, which need Proactor
+        asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
+    else:
+        try:
+            import uvloop
+            asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        except ImportError:
+            pass
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
     yield loop
     loop.close()
 
@@ -294,19 +387,27 @@ async def browser():
         yield browser
         await browser.close()
 
+@pytest.fixture(scope="session")
+async def context_pool(browser):
+    \"\"\"Session-wide pool of pre-warmed browser contexts\"\"\"
+    pool = ContextPool(browser)
+    await pool.start()
+    yield pool
+    await pool.close()
+
 @pytest.fixture
-async def context(browser):
-    \"\"\"Create new browser context for each test\"\"\"
-    context = await browser.new_context()
-    yield context
-    await context.close()
+async def context(context_pool):
+    \"\"\"Borrow a browser context from the pool for each test\"\"\"
+    context = await context_pool.acquire()
+    try:
+        yield context
+    finally:
+        await context_pool.release(context)
 
 @pytest.fixture
 async def page(context):
-    \"\"\"Create new page for each test\"\"\"
-    page = await context.new_page()
-    yield page
-    await page.close()
+    \"\"\"Create new page for each test; the pool clears its storage and closes it\"\"\"
+    return await context.new_page()
 
 def pytest_configure(config):
     \"\"\"Pytest configuration hook\"\"\"
@@ -314,4 +415,5 @@ def pytest_configure(config):
     config.addinivalue_line("markers", "visual: visual regression tests")
     config.addinivalue_line("markers", "api: API tests")
 """
-        return conftest_content
\ No newline at end of file
+        # One copy of the wipe script, shared with the analyzer's context pool
+        return conftest_content.replace("__CLEAR_STORAGE_SCRIPT__", CLEAR_STORAGE_SCRIPT)
\ No newline at end of file
@@ -0,0 +1,94 @@
+import base64
+import re
+from typing import Iterable
+from playwright.async_api import BrowserContext, Page
+
+# Third-party trackers: they keep the network busy and never affect the UI under test
+ANALYTICS_URL_PATTERN = re.compile(
+    r"^https?://([^/]+\.)?(google-analytics\.com|googletagmanager\.com|doubleclick\.net|"
+    r"facebook\.net|hotjar\.com|segment\.(com|io)|mixpanel\.com|clarity\.ms)/"
+)
+
+# File extensions per resource type, so blocking can route by URL instead of intercepting everything
+_RESOURCE_TYPE_EXTENSIONS = {
+    "image": ("png", "jpe?g", "gif", "webp", "avif", "svg", "ico", "bmp"),
+    "font": ("woff2?", "ttf", "otf", "eot"),
+    "media": ("mp4", "webm", "ogg", "ogv", "mp3", "wav", "m4a", "mov", "m3u8"),
+    "stylesheet": ("css",),
+}
+
+# Origin storage that clear_cookies() leaves behind on a reused context
+CLEAR_STORAGE_SCRIPT = """
+async () => {
+    try { localStorage.clear(); sessionStorage.clear(); } catch (e) {}
+    try {
+        if (indexedDB.databases) {
+            for (const db of await indexedDB.databases()) indexedDB.deleteDatabase(db.name);
+        }
+    } catch (e) {}
+    try {
+        if (navigator.serviceWorker) {
+            for (const reg of await navigator.serviceWorker.getRegistrations()) await reg.unregister();
+        }
+        if (window.caches) {
+            for (const key of await caches.keys()) await caches.delete(key);
+        }
+    } catch (e) {}
+}
+"""
+
+
+async def install_resource_blocker(context: BrowserContext, blocked_types: Iterable[str],
+                                   block_analytics: bool = True) -> None:
+    """Abort analytics requests and requests of the given resource types in context
+    
+    Known types are blocked by file extension, so unmatched requests never reach Python
+    and keep the HTTP cache. Any other type needs a catch-all route, which disables it.
+    """
+    blocked_types = set(blocked_types)
+    unmatched_types = blocked_types - _RESOURCE_TYPE_EXTENSIONS.keys()
+    extensions = [ext for t in sorted(blocked_types & _RESOURCE_TYPE_EXTENSIONS.keys())
+                  for ext in _RESOURCE_TYPE_EXTENSIONS[t]]
+    
+    async def abort(route):
+        await route.abort()
+    
+    async def filter_by_type(route):
+        if route.request.resource_type in unmatched_types:
+            await route.abort()
+        else:
+            # Let the routes registered earlier (matched later) see it
+            await route.fallback()
+    
+    if block_analytics:
+        await context.route(ANALYTICS_URL_PATTERN, abort)
+    if extensions:
+        pattern = re.compile(r"^[^?#]*\.(?:" + "|".join(extensions) + r")(?:[?#].*)?$", re.IGNORECASE)
+        await context.route(pattern, abort)
+    if unmatched_types:
+        await context.route("**/*", filter_by_type)
+
+
+async def clear_page_storage(page: Page) -> None:
+    """Wipe local/session storage, IndexedDB, service workers and caches of page's origin"""
+    if page.url.startswith("http"):
+        await page.evaluate(CLEAR_STORAGE_SCRIPT)
+
+
+async def capture_cdp_screenshot(page: Page, full_page: bool, image_type: str, quality: int) -> bytes:
+    """Capture a screenshot straight from Chromium's Page.captureScreenshot"""
+    cdp = await page.context.new_cdp_session(page)
+    try:
+        params = {"format": image_type, "optimizeForSpeed": True}
+        if image_type == "jpeg":
+            params["quality"] = quality
+        if full_page:
+            metrics = await cdp.send("Page.getLayoutMetrics")
+            size = metrics.get("cssContentSize") or metrics["contentSize"]
+            params["captureBeyondViewport"] = True
+            params["clip"] = {"x": 0, "y": 0, "width": size["width"], "height": size["height"], "scale": 1}
+        
+        result = await cdp.send("Page.captureScreenshot", params)
+        return base64.b64decode(result["data"])
+    finally:
+        await cdp.detach()
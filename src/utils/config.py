@@ -1,29 +1,62 @@
 import os
 import yaml
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from pydantic import BaseModel
 from dotenv import load_dotenv
 
 load_dotenv()
 
+class AgentConfig(BaseModel):
+    name: str = "AI Testing Agent"
+    version: str = "1.0.0"
+    max_iterations: int = 10
+    timeout: int = 30
+    max_concurrent_pages: int = 4
+    max_parallel_tests: int = 4
+    per_test_timeout: int = 120
+    inter_test_delay: float = 0
+
 class BrowserConfig(BaseModel):
     type: str = "chromium"
     headless: bool = True
     viewport: Dict[str, int] = {"width": 1920, "height": 1080}
     timeout: int = 30000
+    wait_strategy: str = "dom"
+    block_resource_types: List[str] = ["media"]
+    block_analytics: bool = True
+    test_block_resource_types: List[str] = ["image", "media", "font"]
+    persist_storage_state: bool = False
+    screenshot_type: str = "jpeg"
+    screenshot_quality: int = 80
+    screenshot_full_page: bool = True
+    test_screenshot_type: str = "jpeg"
+    test_screenshot_quality: int = 60
+    test_screenshot_full_page: bool = False
+    test_screenshot_max_width: int = 1920
+    batch_screenshots: bool = True
+    simulate_typing: bool = False
 
 class LLMConfig(BaseModel):
     provider: str = "openai"
     model: str = "gpt-4"
     temperature: float = 0.3
     max_tokens: int = 2000
+    concurrency: int = 4
+    batch_size: int = 4
+    context_window: int = 8192
+    cache_enabled: bool = True
+    cache_ttl: int = 86400
 
 class TestingConfig(BaseModel):
     visual_regression: Dict[str, Any] = {
         "enabled": True,
         "threshold": 0.95,
-        "pixel_diff_threshold": 0.1
+        "pixel_diff_threshold": 0.1,
+        "diff_similarity_floor": 0.8,
+        "coarse_diff_floor": 0.5,
+        "fast_compare": False,
+        "fast_compare_quality": 90
     }
     api_testing: Dict[str, Any] = {
         "enabled": True,
@@ -44,6 +77,7 @@ class Config:
         with open(config_path, 'r') as file:
             self.data = yaml.safe_load(file)
         
+        self.agent = AgentConfig(**self.data.get('agent', {}))
         self.browser = BrowserConfig(**self.data.get('browser', {}))
         self.llm = LLMConfig(**self.data.get('llm', {}))
         self.testing = TestingConfig(**self.data.get('testing', {}))
@@ -57,9 +91,10 @@ class Config:
         self.screenshots_dir = Path(self.data.get('output', {}).get('screenshots_dir', './screenshots'))
         self.reports_dir = Path(self.data.get('output', {}).get('reports_dir', './reports'))
         self.tests_dir = Path(self.data.get('output', {}).get('tests_dir', './generated_tests'))
+        self.cache_dir = Path(self.data.get('output', {}).get('cache_dir', './.cache'))
         
         # Create directories if they don't exist
-        for dir_path in [self.screenshots_dir, self.reports_dir, self.tests_dir]:
+        for dir_path in [self.screenshots_dir, self.reports_dir, self.tests_dir, self.cache_dir]:
             dir_path.mkdir(parents=True, exist_ok=True)
 
 # Global config instance
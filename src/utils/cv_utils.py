@@ -1,43 +1,208 @@
+import os
 import cv2
 import numpy as np
 from PIL import Image, ImageDraw
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Optional, Tuple
 import logging
 from pathlib import Path
 import warnings
 warnings.filterwarnings("ignore", category=ResourceWarning, message="unclosed transport")
 
+try:
+    from numba import config as numba_config, njit, prange
+    # Kernels first run on executor threads; TBB launched from one can hang at interpreter
+    # exit, so prefer the other layers (threads still start lazily, on the first call)
+    numba_config.THREADING_LAYER_PRIORITY = ["omp", "workqueue", "tbb"]
+except ImportError:  # numba is optional; similarity falls back to scikit-image
+    njit = None
+
 logger = logging.getLogger(__name__)
 
+# SSIM constants matching skimage.metrics.structural_similarity defaults for uint8
+_SSIM_WIN_SIZE = 7
+_SSIM_C1 = (0.01 * 255) ** 2
+_SSIM_C2 = (0.03 * 255) ** 2
+
+if njit is not None:
+    @njit(cache=True, parallel=True, fastmath=True)
+    def _ssim_kernel(a, b):
+        """Mean SSIM of two uint8 grayscale images using a 7x7 uniform window"""
+        height, width = a.shape
+        win = _SSIM_WIN_SIZE
+        n = win * win
+        cov_norm = n / (n - 1.0)
+        out_h = height - win + 1
+        out_w = width - win + 1
+        row_sums = np.zeros(out_h)
+        
+        for i in prange(out_h):
+            # Column sums over the window rows, then slide horizontally
+            sa = np.zeros(width)
+            sb = np.zeros(width)
+            saa = np.zeros(width)
+            sbb = np.zeros(width)
+            sab = np.zeros(width)
+            for r in range(i, i + win):
+                for x in range(width):
+                    va = float(a[r, x])
+                    vb = float(b[r, x])
+                    sa[x] += va
+                    sb[x] += vb
+                    saa[x] += va * va
+                    sbb[x] += vb * vb
+                    sab[x] += va * vb
+            
+            wa = wb = waa = wbb = wab = 0.0
+            for x in range(win):
+                wa += sa[x]
+                wb += sb[x]
+                waa += saa[x]
+                wbb += sbb[x]
+                wab += sab[x]
+            
+            acc = 0.0
+            for x in range(out_w):
+                if x > 0:
+                    wa += sa[x + win - 1] - sa[x - 1]
+                    wb += sb[x + win - 1] - sb[x - 1]
+                    waa += saa[x + win - 1] - saa[x - 1]
+                    wbb += sbb[x + win - 1] - sbb[x - 1]
+                    wab += sab[x + win - 1] - sab[x - 1]
+                ux = wa / n
+                uy = wb / n
+                vx = cov_norm * (waa / n - ux * ux)
+                vy = cov_norm * (wbb / n - uy * uy)
+                vxy = cov_norm * (wab / n - ux * uy)
+                acc += ((2 * ux * uy + _SSIM_C1) * (2 * vxy + _SSIM_C2)) / \
+                       ((ux * ux + uy * uy + _SSIM_C1) * (vx + vy + _SSIM_C2))
+            row_sums[i] = acc
+        
+        return row_sums.sum() / (out_h * out_w)
+    
+    @njit(cache=True, fastmath=True)
+    def _dhash_kernel(small):
+        """64-bit difference hash of an 8x9 uint8 grayscale thumbnail"""
+        h = np.uint64(0)
+        for y in range(8):
+            for x in range(8):
+                h = h << np.uint64(1)
+                if small[y, x + 1] > small[y, x]:
+                    h = h | np.uint64(1)
+        return h
+    
+    @njit(cache=True)
+    def _hamming_kernel(a, b):
+        """Number of differing bits between two 64-bit hashes"""
+        x = a ^ b
+        count = 0
+        while x:
+            x = x & (x - np.uint64(1))
+            count += 1
+        return count
+    
+    @njit(cache=True, parallel=True, fastmath=True)
+    def _diff_overlay_kernel(baseline, current, out, threshold):
+        """Fused absdiff, grayscale, threshold and red overlay in one pass over the pixels"""
+        height, width = current.shape[:2]
+        for y in prange(height):
+            for x in range(width):
+                db = abs(np.int32(baseline[y, x, 0]) - np.int32(current[y, x, 0]))
+                dg = abs(np.int32(baseline[y, x, 1]) - np.int32(current[y, x, 1]))
+                dr = abs(np.int32(baseline[y, x, 2]) - np.int32(current[y, x, 2]))
+                # BGR weights of cv2.COLOR_BGR2GRAY, rounded to the nearest gray level
+                if int(0.114 * db + 0.587 * dg + 0.299 * dr + 0.5) > threshold:
+                    out[y, x, 0] = 0
+                    out[y, x, 1] = 0
+                    out[y, x, 2] = 255
+                else:
+                    out[y, x, 0] = current[y, x, 0]
+                    out[y, x, 1] = current[y, x, 1]
+                    out[y, x, 2] = current[y, x, 2]
+    
+    # Compile (or load from the on-disk cache) up front instead of on the first comparison
+    if os.getenv("AIT_NUMBA_WARMUP"):
+        _ssim_kernel(np.zeros((16, 16), np.uint8), np.zeros((16, 16), np.uint8))
+        _hamming_kernel(_dhash_kernel(np.zeros((8, 9), np.uint8)), np.uint64(0))
+        _diff_overlay_kernel(np.zeros((2, 2, 3), np.uint8), np.zeros((2, 2, 3), np.uint8),
+                             np.empty((2, 2, 3), np.uint8), 30)
+else:
+    _ssim_kernel = None
+    _dhash_kernel = None
+    _hamming_kernel = None
+    _diff_overlay_kernel = None
+
+# dHash distance above which two screenshots are clearly different and SSIM is skipped
+_HASH_DISTANCE_THRESHOLD = 10
+
+def _dhash(gray: np.ndarray) -> int:
+    """Difference hash of a grayscale image"""
+    small = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA)
+    if _dhash_kernel is not None:
+        return int(_dhash_kernel(small))
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int(''.join('1' if bit else '0' for bit in bits), 2)
+
+def _hamming(a: int, b: int) -> int:
+    """Hamming distance between two hashes"""
+    if _hamming_kernel is not None:
+        return int(_hamming_kernel(np.uint64(a), np.uint64(b)))
+    return bin(a ^ b).count('1')
+
+def _bounds_array(elements: List[Dict[str, Any]]) -> np.ndarray:
+    """(n, 4) array of [x, y, width, height] from elements' bounds"""
+    boxes = np.zeros((len(elements), 4), dtype=np.float64)
+    for i, element in enumerate(elements):
+        bounds = element.get("bounds") or {}
+        boxes[i] = (bounds.get("x", 0), bounds.get("y", 0), bounds.get("width", 0), bounds.get("height", 0))
+    return boxes
+
+def _box_iou(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Pairwise IoU of two [x, y, width, height] box arrays, shape (len(a), len(b))"""
+    a_min, b_min = a[:, None, :2], b[None, :, :2]
+    overlap = np.clip(np.minimum(a_min + a[:, None, 2:], b_min + b[None, :, 2:]) - np.maximum(a_min, b_min), 0, None)
+    intersection = overlap[..., 0] * overlap[..., 1]
+    union = (a[:, 2] * a[:, 3])[:, None] + (b[:, 2] * b[:, 3])[None, :] - intersection
+    return np.divide(intersection, union, out=np.zeros_like(intersection), where=union > 0)
+
 class ComputerVisionUtils:
     def __init__(self):
         self.visual_threshold = 0.95
+        self.hash_distance_threshold = _HASH_DISTANCE_THRESHOLD
+        # Baseline hashes keyed by (path, mtime) so each baseline is hashed once
+        self._hash_cache: Dict[Tuple[str, float], int] = {}
 
     def compare_screenshots(self, image1_path: str, image2_path: str) -> Dict[str, Any]:
         """Compare two screenshots for visual regression testing"""
+        return self.compare_images(cv2.imread(image1_path), cv2.imread(image2_path), image1_path)
+
+    def compare_images(self, img1: np.ndarray, img2: np.ndarray, image1_path: str) -> Dict[str, Any]:
+        """Compare already decoded screenshots; image1_path keys the baseline hash and names the diff"""
         try:
-            img1 = cv2.imread(image1_path)
-            img2 = cv2.imread(image2_path)
-            
             if img1 is None or img2 is None:
                 return {"error": "Could not load images"}
             
             # Resize images to same size if different
-            if img1.shape != img2.shape:
-                img2 = cv2.resize(img2, (img1.shape[1], img1.shape[0]))
+            img2 = self.match_size(img2, img1)
             
-            # Calculate similarity
-            similarity = self._calculate_similarity(img1, img2)
+            # Calculate similarity, skipping SSIM when the perceptual hashes already disagree
+            gray1 = cv2.cvtColor(img1, cv2.COLOR_BGR2GRAY)
+            gray2 = cv2.cvtColor(img2, cv2.COLOR_BGR2GRAY)
+            distance = _hamming(self._baseline_hash(image1_path, gray1), _dhash(gray2))
+            if distance > self.hash_distance_threshold:
+                similarity = 1.0 - distance / 64.0
+            else:
+                similarity = self._calculate_similarity(img1, img2, gray1, gray2)
             
             # Find differences
             diff_mask = self._create_diff_mask(img1, img2)
             
-            # Generate diff image
-            diff_image_path = self._create_diff_image(img1, img2, diff_mask, image1_path)
+            # Only failing comparisons need a diff image on disk
+            passed = similarity >= self.visual_threshold
+            diff_image_path = "" if passed else self._create_diff_image(img1, img2, diff_mask, image1_path)
             
             return {
                 "similarity": similarity,
-                "passed": similarity >= self.visual_threshold,
+                "passed": passed,
                 "diff_image": diff_image_path,
                 "differences_found": np.sum(diff_mask) > 0
             }
@@ -48,8 +213,14 @@ class ComputerVisionUtils:
 
     def detect_ui_elements(self, image_path: str) -> List[Dict[str, Any]]:
         """Detect UI elements in screenshot using computer vision"""
+        return self._detect_ui_elements(cv2.imread(image_path))
+
+    def detect_ui_elements_bytes(self, data: bytes) -> List[Dict[str, Any]]:
+        """Detect UI elements in an encoded (PNG/JPEG) screenshot"""
+        return self._detect_ui_elements(cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR))
+
+    def _detect_ui_elements(self, img: np.ndarray) -> List[Dict[str, Any]]:
         try:
-            img = cv2.imread(image_path)
             gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
             
             elements = []
@@ -72,6 +243,21 @@ class ComputerVisionUtils:
             logger.error(f"Error detecting UI elements: {e}")
             return []
 
+    def match_dom_elements(self, cv_elements: List[Dict[str, Any]],
+                           dom_elements: Dict[str, List[Dict[str, Any]]],
+                           iou_threshold: float = 0.5, dom_boxes: Optional[np.ndarray] = None) -> List[Dict[str, Any]]:
+        """Flag CV detections that overlap a DOM element (IoU >= threshold) with dom_match
+        
+        dom_boxes, the (N, 4) boxes of dom_elements when already gathered, skips rebuilding them.
+        """
+        if dom_boxes is None:
+            dom_boxes = _bounds_array([element for elements in dom_elements.values() for element in elements])
+        if not cv_elements or not len(dom_boxes):
+            return [{**element, "dom_match": False} for element in cv_elements]
+        
+        matched = (_box_iou(_bounds_array(cv_elements), dom_boxes) >= iou_threshold).any(axis=1)
+        return [{**element, "dom_match": bool(match)} for element, match in zip(cv_elements, matched)]
+
     def extract_text_regions(self, image_path: str) -> List[Dict[str, Any]]:
         """Extract text regions from screenshot"""
         try:
@@ -98,14 +284,29 @@ class ComputerVisionUtils:
             logger.error(f"Error extracting text regions: {e}")
             return []
 
-    def _calculate_similarity(self, img1: np.ndarray, img2: np.ndarray) -> float:
+    def _baseline_hash(self, image_path: str, gray: np.ndarray) -> int:
+        """dHash of a baseline image, cached until the file changes"""
+        key = (image_path, os.path.getmtime(image_path))
+        image_hash = self._hash_cache.get(key)
+        if image_hash is None:
+            image_hash = self._hash_cache[key] = _dhash(gray)
+        return image_hash
+
+    def _calculate_similarity(self, img1: np.ndarray, img2: np.ndarray,
+                              gray1: np.ndarray = None, gray2: np.ndarray = None) -> float:
         """Calculate structural similarity between images"""
-        try:
-            from skimage.metrics import structural_similarity as ssim
-            
-            # Convert to grayscale
+        # Convert to grayscale
+        if gray1 is None:
             gray1 = cv2.cvtColor(img1, cv2.COLOR_BGR2GRAY)
+        if gray2 is None:
             gray2 = cv2.cvtColor(img2, cv2.COLOR_BGR2GRAY)
+        
+        if _ssim_kernel is not None and min(gray1.shape) >= _SSIM_WIN_SIZE:
+            # JIT-compiled SSIM, same result as scikit-image's defaults
+            return float(_ssim_kernel(gray1, gray2))
+        
+        try:
+            from skimage.metrics import structural_similarity as ssim
             
             # Calculate SSIM
             similarity = ssim(gray1, gray2)
@@ -119,6 +320,35 @@ class ComputerVisionUtils:
             similarity = 1.0 - (non_zero_count / total_pixels)
             return similarity
 
+    def match_size(self, img: np.ndarray, reference: np.ndarray) -> np.ndarray:
+        """img resized to reference's size; INTER_AREA to shrink, INTER_LINEAR to enlarge"""
+        if img.shape[:2] == reference.shape[:2]:
+            return img
+        height, width = reference.shape[:2]
+        shrinking = width * height < img.shape[0] * img.shape[1]
+        return cv2.resize(img, (width, height), interpolation=cv2.INTER_AREA if shrinking else cv2.INTER_LINEAR)
+
+    def coarse_difference(self, img1: np.ndarray, img2: np.ndarray, levels: int = 2) -> Tuple[float, int]:
+        """Mean and max grayscale difference of same-sized images after `levels` pyrDown steps"""
+        for _ in range(levels):
+            img1 = cv2.pyrDown(img1)
+            img2 = cv2.pyrDown(img2)
+        gray_diff = cv2.cvtColor(cv2.absdiff(img1, img2), cv2.COLOR_BGR2GRAY)
+        return float(gray_diff.mean()), int(gray_diff.max())
+
+    def highlight_differences(self, baseline: np.ndarray, current: np.ndarray, threshold: int = 30) -> np.ndarray:
+        """Copy of current with pixels that differ from baseline painted red"""
+        if _diff_overlay_kernel is not None:
+            out = np.empty_like(current)
+            _diff_overlay_kernel(baseline, current, out, threshold)
+            return out
+        
+        gray_diff = cv2.cvtColor(cv2.absdiff(baseline, current), cv2.COLOR_BGR2GRAY)
+        _, mask = cv2.threshold(gray_diff, threshold, 255, cv2.THRESH_BINARY)
+        red = np.empty_like(current)
+        red[:] = (0, 0, 255)
+        return cv2.copyTo(red, mask, current.copy())
+
     def _create_diff_mask(self, img1: np.ndarray, img2: np.ndarray) -> np.ndarray:
         """Create a mask highlighting differences between images"""
         diff = cv2.absdiff(img1, img2)
@@ -0,0 +1,22 @@
+import io
+from PIL import Image
+
+
+def image_width(data: bytes) -> int:
+    """Width of an encoded image, read from its header without decoding the pixels"""
+    with Image.open(io.BytesIO(data)) as image:
+        return image.width
+
+
+def encode_and_save(data: bytes, path: str, image_type: str, quality: int, max_width: int) -> None:
+    """Downscale a screenshot wider than max_width and re-encode it to path
+
+    Kept free of heavy imports: it runs in spawned worker processes.
+    """
+    image = Image.open(io.BytesIO(data))
+    if image.width > max_width:
+        image = image.resize((max_width, max(1, round(image.height * max_width / image.width))), Image.LANCZOS)
+    if image_type == "jpeg":
+        image.convert("RGB").save(path, format="JPEG", quality=quality, optimize=True)
+    else:
+        image.save(path, format="PNG", optimize=True)
@@ -0,0 +1,38 @@
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    """Serialize numpy scalars/arrays the way orjson's OPT_SERIALIZE_NUMPY does"""
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj: Any, indent: bool = True, sort_keys: bool = False) -> bytes:
+    """Serialize obj to UTF-8 encoded JSON bytes"""
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, option=option)
+    
+    # Same bytes as orjson: compact separators and raw (not \u-escaped) UTF-8
+    return json.dumps(
+        obj, indent=2 if indent else None, separators=(",", ": ") if indent else (",", ":"),
+        sort_keys=sort_keys, ensure_ascii=False, default=_default
+    ).encode("utf-8")
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Deserialize JSON from bytes or str"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
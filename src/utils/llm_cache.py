@@ -0,0 +1,61 @@
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+from utils import json_utils
+
+logger = logging.getLogger(__name__)
+
+class LLMCache:
+    """On-disk cache of LLM responses keyed by model settings and prompt"""
+
+    def __init__(self, cache_dir: Path, ttl: int = 86400):
+        self.cache_dir = Path(cache_dir)
+        self.ttl = ttl
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def make_key(payload: Dict[str, Any]) -> str:
+        """Stable hash of a request payload"""
+        return hashlib.sha256(json_utils.dumps(payload, indent=False, sort_keys=True)).hexdigest()
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for key, or None when missing or expired"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._read, key)
+
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        """Store value under key"""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._write, key, value, self.ttl if ttl is None else ttl)
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def _read(self, key: str) -> Optional[Any]:
+        path = self._path(key)
+        try:
+            entry = json_utils.loads(path.read_bytes())
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Discarding unreadable LLM cache entry {path}: {e}")
+            return None
+
+        if entry.get("expires", 0) < time.time():
+            path.unlink(missing_ok=True)
+            return None
+        return entry.get("value")
+
+    def _write(self, key: str, value: Any, ttl: int) -> None:
+        path = self._path(key)
+        tmp_path = path.with_name(f"{key}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            tmp_path.write_bytes(json_utils.dumps({"expires": time.time() + ttl, "value": value}, indent=False))
+            tmp_path.replace(path)
+        except Exception as e:
+            logger.warning(f"Could not write LLM cache entry {path}: {e}")
@@ -1,7 +1,8 @@
 from openai import OpenAI
 import asyncio
-from typing import List, Dict, Any, Optional
+from typing import Any, Callable, Dict, List, Optional
 from utils.config import config
+from utils.llm_cache import LLMCache
 import logging
 import json
 import warnings
@@ -18,17 +19,68 @@ class LLMClient:
         self.model = config.llm.model
         self.temperature = config.llm.temperature
         self.max_tokens = config.llm.max_tokens
+        self.batch_size = config.llm.batch_size
+        self.context_window = config.llm.context_window
+        self.cache = LLMCache(config.cache_dir / "llm", ttl=config.llm.cache_ttl) if config.llm.cache_enabled else None
 
     async def generate_test_cases(self, page_info: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Generate test cases based on page analysis"""
+        test_cases = await self._try_generate_test_cases(page_info)
+        return test_cases if test_cases is not None else []
+
+    async def _try_generate_test_cases(self, page_info: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+        """Test cases for one page, or None when the call or its answer failed"""
         prompt = self._create_test_generation_prompt(page_info)
         
         try:
-            response = await self._call_llm(prompt)
-            return self._parse_test_cases(response)
+            return await self._call_llm(prompt, parse=lambda response: self._load_json(response).get('test_cases', []))
         except Exception as e:
             logger.error(f"Error generating test cases: {e}")
-            return []
+            return None
+
+    async def generate_test_cases_batch(self, pages: List[Dict[str, Any]]) -> List[Optional[List[Dict[str, Any]]]]:
+        """Generate test cases for several pages with one LLM call, one list per page (None where generation failed)"""
+        if len(pages) == 1:
+            return [await self._try_generate_test_cases(pages[0])]
+        
+        prompt = self._create_batch_test_generation_prompt(pages)
+        batches = None
+        
+        try:
+            batches = await self._call_llm(
+                prompt, max_tokens=self.max_tokens * len(pages),
+                parse=lambda response: self._parse_test_case_batch(response, len(pages))
+            )
+        except Exception as e:
+            logger.error(f"Error generating batched test cases: {e}")
+        
+        if batches is None:
+            batches = [[] for _ in pages]
+        
+        # Fall back to one call per page for pages the batched answer left out
+        return [
+            test_cases or await self._try_generate_test_cases(page)
+            for page, test_cases in zip(pages, batches)
+        ]
+
+    def split_batches(self, pages: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """Group pages into batches whose prompt and answer fit the model's context window"""
+        batches = []
+        current = []
+        used = self._estimate_tokens(self._create_batch_test_generation_prompt([]))
+        
+        for page in pages:
+            cost = self._estimate_tokens(self._format_page_summary(0, page)) + self.max_tokens
+            if current and (len(current) >= self.batch_size or used + cost > self.context_window):
+                batches.append(current)
+                current = []
+                used = self._estimate_tokens(self._create_batch_test_generation_prompt([]))
+            current.append(page)
+            used += cost
+        
+        if current:
+            batches.append(current)
+        return batches
 
     async def analyze_ui_elements(self, elements: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Analyze UI elements and suggest test scenarios"""
@@ -63,18 +115,47 @@ class LLMClient:
             logger.error(f"Error generating load tests: {e}")
             return ""
 
-    async def _call_llm(self, prompt: str) -> str:
-        """Call the configured LLM"""
+    async def _call_llm(self, prompt: str, max_tokens: Optional[int] = None,
+                        parse: Optional[Callable[[str], Any]] = None) -> Any:
+        """Call the configured LLM, reusing cached responses for identical requests
+        
+        With parse, returns parse(response) and only caches responses it accepts (does not
+        raise for), so one malformed answer is not replayed for the whole cache TTL.
+        """
+        max_tokens = max_tokens or self.max_tokens
+        parse = parse or (lambda response: response)
+        if self.cache is None:
+            return parse(await self._call_provider(prompt, max_tokens))
+        
+        key = LLMCache.make_key({
+            "provider": self.provider,
+            "model": self.model,
+            "temperature": self.temperature,
+            "max_tokens": max_tokens,
+            "prompt": prompt
+        })
+        response = await self.cache.get(key)
+        if response is not None:
+            logger.debug(f"LLM cache hit {key[:12]}")
+            return parse(response)
+        
+        response = await self._call_provider(prompt, max_tokens)
+        result = parse(response)
+        await self.cache.set(key, response)
+        return result
+
+    async def _call_provider(self, prompt: str, max_tokens: int) -> str:
+        """Call the configured LLM provider"""
         if self.provider == "openai":
-            return await self._call_openai(prompt)
+            return await self._call_openai(prompt, max_tokens)
         else:
             raise NotImplementedError(f"Provider {self.provider} not implemented")
 
-    async def _call_openai(self, prompt: str) -> str:
+    async def _call_openai(self, prompt: str, max_tokens: int) -> str:
         """Call OpenAI API using the new client"""
         try:
             # Run the synchronous OpenAI call in a thread pool to make it async
-            loop = asyncio.get_event_loop()
+            loop = asyncio.get_running_loop()
             response = await loop.run_in_executor(
                 None,
                 lambda: self.openai_client.chat.completions.create(
@@ -84,7 +165,7 @@ class LLMClient:
                         {"role": "user", "content": prompt}
                     ],
                     temperature=self.temperature,
-                    max_tokens=self.max_tokens
+                    max_tokens=max_tokens
                 )
             )
             return response.choices[0].message.content
@@ -126,6 +207,55 @@ class LLMClient:
         5. Accessibility tests
         """
 
+    def _format_page_summary(self, index: int, page_info: Dict[str, Any]) -> str:
+        """Describe one page inside a batched prompt"""
+        return f"""
+        Page {index}:
+        Page URL: {page_info.get('url', 'N/A')}
+        Page Title: {page_info.get('title', 'N/A')}
+        Forms: {page_info.get('forms', [])}
+        Buttons: {page_info.get('buttons', [])}
+        Links: {page_info.get('links', [])}
+        Input Fields: {page_info.get('inputs', [])}
+        """
+
+    def _create_batch_test_generation_prompt(self, pages: List[Dict[str, Any]]) -> str:
+        """Create one prompt asking for test cases for several pages"""
+        page_sections = "".join(self._format_page_summary(i, page) for i, page in enumerate(pages))
+        return f"""
+        Based on the following web page analyses, generate comprehensive test cases for each page:
+        {page_sections}
+        Please return one entry per page, using the page index shown above, in the following JSON format:
+        {{
+            "pages": [
+                {{
+                    "index": 0,
+                    "test_cases": [
+                        {{
+                            "name": "Test case name",
+                            "description": "Test case description",
+                            "steps": ["Step 1", "Step 2", "Step 3"],
+                            "expected_result": "Expected outcome",
+                            "priority": "high|medium|low",
+                            "type": "functional|ui|integration"
+                        }}
+                    ]
+                }}
+            ]
+        }}
+
+        Focus on:
+        1. Form validation tests
+        2. Navigation tests
+        3. UI interaction tests
+        4. Edge cases and error scenarios
+        5. Accessibility tests
+        """
+
+    def _estimate_tokens(self, text: str) -> int:
+        """Rough token count (about four characters per token)"""
+        return len(text) // 4 + 1
+
     def _create_ui_analysis_prompt(self, elements: List[Dict[str, Any]]) -> str:
         """Create prompt for UI element analysis"""
         return f"""
@@ -176,26 +306,36 @@ class LLMClient:
         Format as complete Python Locust file.
         """
 
-    def _parse_test_cases(self, response: str) -> List[Dict[str, Any]]:
-        """Parse test cases from LLM response"""
+    def _load_json(self, response: str) -> Any:
+        """JSON payload of an LLM response, unwrapping markdown code fences; raises if unparseable"""
+        # Extract JSON from response if wrapped in markdown
+        if "```json" in response:
+            json_start = response.find("```json") + 7
+            json_end = response.find("```", json_start)
+            response = response[json_start:json_end].strip()
+        elif "```" in response:
+            # Handle cases where JSON is in code blocks without language specification
+            json_start = response.find("```") + 3
+            json_end = response.find("```", json_start)
+            response = response[json_start:json_end].strip()
+        
         try:
-            # Extract JSON from response if wrapped in markdown
-            if "```json" in response:
-                json_start = response.find("```json") + 7
-                json_end = response.find("```", json_start)
-                response = response[json_start:json_end].strip()
-            elif "```" in response:
-                # Handle cases where JSON is in code blocks without language specification
-                json_start = response.find("```") + 3
-                json_end = response.find("```", json_start)
-                response = response[json_start:json_end].strip()
-            
-            data = json.loads(response)
-            return data.get('test_cases', [])
-        except Exception as e:
-            logger.error(f"Error parsing test cases: {e}")
+            return json.loads(response)
+        except ValueError:
             logger.debug(f"Response that failed to parse: {response}")
-            return []
+            raise
+
+    def _parse_test_case_batch(self, response: str, count: int) -> List[List[Dict[str, Any]]]:
+        """Parse per-page test cases from a batched LLM response; raises if unusable"""
+        batches = [[] for _ in range(count)]
+        for entry in self._load_json(response).get('pages', []):
+            index = entry.get('index')
+            if isinstance(index, int) and 0 <= index < count:
+                batches[index].extend(entry.get('test_cases', []))
+        
+        if not any(batches):
+            raise ValueError("Batched answer has no usable pages")
+        return batches
 
     def _parse_ui_analysis(self, response: str) -> Dict[str, Any]:
         """Parse UI analysis from LLM response"""